@@ -1,25 +1,28 @@
 """Taipower integration."""
-import functools
 import logging
 from dataclasses import dataclass, field
-from datetime import timedelta
 from typing import Optional
 
-import async_timeout
+from homeassistant.core import callback
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import discovery
-from homeassistant.helpers.update_coordinator import (CoordinatorEntity,
-                                                      DataUpdateCoordinator)
-
-from .const import (AMI_KEY, API, CONF_ACCOUNT, CONF_AMI_PERIOD, CONF_DEVICES,
-                    CONF_PASSWORD, CONF_RETRY, CONFIG_SCHEMA, COORDINATOR,
-                    DOMAIN, MONTH_KEY)
+from homeassistant.helpers.dispatcher import (async_dispatcher_connect,
+                                              async_dispatcher_send)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import (API, BILL_COORDINATOR, CACHE, CONF_ACCOUNT, CONF_AMI_PERIOD,
+                    CONF_BLOCKING_CLIENT, CONF_DEVICES, CONF_METERS,
+                    CONF_PASSWORD, CONF_RETRY, CONF_TARIFF, CONF_TOKENS,
+                    CONFIG_SCHEMA,
+                    COORDINATOR, DATA_AMI, DATA_BILL, DATA_METRICS,
+                    DATA_UNBILLED, DEFAULT_TARIFF, DOMAIN, SIGNAL_UPDATE,
+                    YAML_DATA)
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = ["number", "sensor"]
-DATA_UPDATE_INTERVAL = timedelta(minutes=30)
-BASE_TIMEOUT = 5
-
-from Taipower.api import TaipowerAPI
+# The client library, NumPy and the coordinators are only imported by the
+# setup functions, keeping them off the path of merely loading the integration
+# and its config flow, see scripts/import_time.py.
 
 
 async def async_setup(hass, config):
@@ -42,74 +45,63 @@ async def async_setup(hass, config):
             "CONF_DEVICES": config[DOMAIN].get(CONF_DEVICES),
             "CONF_AMI_PERIOD": config[DOMAIN].get(CONF_AMI_PERIOD),
             "CONF_RETRY": config.get(CONF_RETRY),
+            "CONF_BLOCKING_CLIENT": config[DOMAIN].get(CONF_BLOCKING_CLIENT),
         }
     )
 
     if config[DOMAIN].get(CONF_DEVICES) == []:
         config[DOMAIN][CONF_DEVICES] = None
 
-    api = TaipowerAPI(
-        account=config[DOMAIN].get(CONF_ACCOUNT),
-        password=config[DOMAIN].get(CONF_PASSWORD),
-        electric_numbers=config[DOMAIN].get(CONF_DEVICES),
-        ami_period=config[DOMAIN].get(CONF_AMI_PERIOD),
-        max_retries=config[DOMAIN].get(CONF_RETRY),
-    )
+    from .api import create_api
+    from .cache import TaipowerCache
+    from .coordinator import create_coordinators
+    from .services import async_setup_services
+
+    api = create_api(hass, config[DOMAIN])
 
-    hass.data[DOMAIN] = {}
-    hass.data[DOMAIN][API] = api
-    hass.data[DOMAIN][AMI_KEY] = None
-    hass.data[DOMAIN][MONTH_KEY] = None
-    hass.data[DOMAIN][COORDINATOR] = None
+    data = hass.data.setdefault(DOMAIN, {})[YAML_DATA] = {}
+    data[API] = api
+    data[COORDINATOR] = None
+    data[BILL_COORDINATOR] = None
+    data[CACHE] = None
+
+    cache = TaipowerCache(hass)
+    await cache.async_load()
+    data[CACHE] = cache
 
     try:
-        await hass.async_add_executor_job(api.login)
+        await api.async_login(refresh=False)
     except AssertionError as err:
         _LOGGER.error(f"Assertion check error: {err}")
+        hass.data[DOMAIN].pop(YAML_DATA)
         return False
     except RuntimeError as err:
         _LOGGER.error(f"Failed to login API: {err}")
+        hass.data[DOMAIN].pop(YAML_DATA)
         return False
 
     _LOGGER.debug(
         f"Electric meter info: {[meter for meter in api.meters.values()]}")
     
-    async def async_update_data():
-        """Fetch data from API endpoint.
-
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
-        """
-        try:
-            # Note: asyncio.TimeoutError and aiohttp.ClientError are already
-            # handled by the data update coordinator.
-            async with async_timeout.timeout(BASE_TIMEOUT + len(api.meters) * 2):
-                await hass.async_add_executor_job(functools.partial(api.refresh_status, refresh_ami_bill=False))
-
-        except Exception as err:
-            _LOGGER.error(err)
-            raise
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        # Name of the data. For logging purposes.
-        name=DOMAIN,
-        update_method=async_update_data,
-        # Polling interval. Will only be polled if there are subscribers.
-        update_interval=DATA_UPDATE_INTERVAL,
+    uncached = cache.restore_meters(api)
+    ami_coordinators, bill_coordinators = create_coordinators(
+        hass, api, cache, config[DOMAIN].get(CONF_TARIFF, DEFAULT_TARIFF)
     )
 
-    await coordinator.async_refresh()
-
-    hass.data[DOMAIN][COORDINATOR] = coordinator
+    data[COORDINATOR] = ami_coordinators
+    data[BILL_COORDINATOR] = bill_coordinators
+    async_setup_services(hass)
     
     # Start Taipower components
-    if hass.data[DOMAIN][API]:
+    if data[API]:
         _LOGGER.debug("Starting Taipower components.")
         for platform in PLATFORMS:
             discovery.load_platform(hass, platform, DOMAIN, {}, config)
 
+    hass.async_create_background_task(
+        async_start_account(hass, data, uncached), f"{DOMAIN} startup"
+    )
+
     # Return boolean to indicate that initialization was successful.
     return True
 
@@ -123,84 +115,144 @@ async def async_setup_entry(hass, config_entry):
             "CONF_PASSWORD": '*' * len(config.get(CONF_PASSWORD)),
             "CONF_DEVICES": config.get(CONF_DEVICES),
             "CONF_AMI_PERIOD": config.get(CONF_AMI_PERIOD),
-            "CONF_RETRY": config.get(CONF_RETRY),            
+            "CONF_RETRY": config.get(CONF_RETRY),
+            "CONF_BLOCKING_CLIENT": config.get(CONF_BLOCKING_CLIENT),
         }
     )
 
     if config.get(CONF_DEVICES) == []:
         config[CONF_DEVICES] = None
 
-    api = TaipowerAPI(
-        account=config.get(CONF_ACCOUNT),
-        password=config.get(CONF_PASSWORD),
-        electric_numbers=config.get(CONF_DEVICES),
-        ami_period=config.get(CONF_AMI_PERIOD),
-        max_retries=config.get(CONF_RETRY),
-    )
+    from .api import create_api
+    from .cache import STORAGE_KEY, TaipowerCache
+    from .coordinator import create_coordinators
+    from .services import async_setup_services
 
-    hass.data[DOMAIN] = {}
-    hass.data[DOMAIN][API] = api
-    hass.data[DOMAIN][AMI_KEY] = None
-    hass.data[DOMAIN][MONTH_KEY] = None
-    hass.data[DOMAIN][COORDINATOR] = None
+    def save_tokens(tokens):
+        hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, CONF_TOKENS: tokens}
+        )
 
-    try:
-        await hass.async_add_executor_job(api.login)
-    except AssertionError as err:
-        _LOGGER.error(f"Assertion check error: {err}")
-        return False
-    except RuntimeError as err:
-        _LOGGER.error(f"Failed to login API: {err}")
-        return False
-
-    _LOGGER.debug(
-        f"Electric meter info: {[meter for meter in api.meters.values()]}")
-    
-    async def _async_update_data():
-        """Fetch data from API endpoint.
+    api = create_api(
+        hass, config, tokens=config_entry.data.get(CONF_TOKENS), on_tokens_updated=save_tokens
+    )
 
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
-        """
+    # Every account gets its own client, coordinators and cache.
+    data = hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = {}
+    data[API] = api
+    data[COORDINATOR] = None
+    data[BILL_COORDINATOR] = None
+    data[CACHE] = None
+
+    cache = TaipowerCache(hass, f"{STORAGE_KEY}.{config_entry.entry_id}")
+    await cache.async_load()
+    data[CACHE] = cache
+
+    def save_meters():
+        meters = config_entry.data.get(CONF_METERS) or []
+        hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, CONF_METERS: api.meter_data}
+        )
+        if {meter["electricNumber"] for meter in meters} != set(api.meters):
+            _LOGGER.info("Electric meters of the account changed, reloading.")
+            hass.async_create_task(hass.config_entries.async_reload(config_entry.entry_id))
+
+    # Meters saved by an earlier login let entities be set up before logging in again.
+    restored = bool(config_entry.data.get(CONF_METERS)) and api.restore_meters(config_entry.data[CONF_METERS])
+    if not restored:
         try:
-            # Note: asyncio.TimeoutError and aiohttp.ClientError are already
-            # handled by the data update coordinator.
-            async with async_timeout.timeout(BASE_TIMEOUT + len(api.meters) * 2):
-                await hass.async_add_executor_job(functools.partial(api.refresh_status, refresh_ami_bill=False))
-
-        except Exception as err:
-            _LOGGER.error(err)
-            raise
+            await api.async_login(refresh=False)
+        except AssertionError as err:
+            _LOGGER.error(f"Assertion check error: {err}")
+            hass.data[DOMAIN].pop(config_entry.entry_id)
+            return False
+        except RuntimeError as err:
+            hass.data[DOMAIN].pop(config_entry.entry_id)
+            raise ConfigEntryNotReady(f"Failed to login API: {err}") from err
+        hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, CONF_METERS: api.meter_data}
+        )
 
-    def _async_forward_entry_setup():
-        for platform in PLATFORMS:
-            hass.async_create_task(
-                hass.config_entries.async_forward_entry_setup(config_entry, platform)
-            )
+    _LOGGER.debug(
+        f"Electric meter info: {[meter for meter in api.meters.values()]}")
 
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        # Name of the data. For logging purposes.
-        name=DOMAIN,
-        update_method=_async_update_data,
-        # Polling interval. Will only be polled if there are subscribers.
-        update_interval=DATA_UPDATE_INTERVAL,
+    uncached = cache.restore_meters(api)
+    ami_coordinators, bill_coordinators = create_coordinators(
+        hass, api, cache, config.get(CONF_TARIFF, DEFAULT_TARIFF)
     )
 
-    await coordinator.async_refresh()
-
-    hass.data[DOMAIN][COORDINATOR] = coordinator
+    data[COORDINATOR] = ami_coordinators
+    data[BILL_COORDINATOR] = bill_coordinators
+    async_setup_services(hass)
     
     # Start Taipower components
-    if hass.data[DOMAIN][API]:
+    if data[API]:
         _LOGGER.debug("Starting Taipower components.")
-        _async_forward_entry_setup()
-    
+        await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+
+    config_entry.async_create_background_task(
+        hass,
+        async_start_account(hass, data, uncached, login=restored, on_meters_updated=save_meters),
+        f"{DOMAIN} {config_entry.entry_id} startup",
+    )
+
     # Return boolean to indicate that initialization was successful.
     return True
 
 
+async def async_start_account(hass, data, uncached, login=False, on_meters_updated=None):
+    """Bring an account set up from restored data up to date, off the startup path.
+
+    Logs in first if the meters were restored from saved metadata, calling
+    `on_meters_updated` with the new metadata unless that fails, in which case
+    the coordinators retry on their own schedule. Then uncached meters are
+    fetched, those failing are left to their coordinators, which run their
+    first refreshes.
+    """
+    from .coordinator import async_start_coordinators
+
+    api = data[API]
+    if login:
+        try:
+            await api.async_login(refresh=False)
+        except (AssertionError, RuntimeError) as err:
+            _LOGGER.warning(f"Failed to login API, refreshes will retry: {err}")
+        else:
+            if on_meters_updated is not None:
+                on_meters_updated()
+            if set(api.meters) != set(data[COORDINATOR]):
+                return
+
+    fetched = await data[CACHE].async_fetch(api, uncached)
+    await async_start_coordinators(hass, data[COORDINATOR], data[BILL_COORDINATOR], fetched)
+
+
+async def async_unload_entry(hass, config_entry):
+    """Unload a config entry, leaving the other accounts running."""
+    from .broker import async_remove_broker
+    from .services import async_unload_services
+
+    unloaded = await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
+    if not unloaded:
+        return False
+
+    data = hass.data[DOMAIN].pop(config_entry.entry_id)
+    await data[CACHE].async_flush()
+    broker = getattr(data[API], "broker", None)
+    if broker is not None and not any(getattr(other[API], "broker", None) is broker for other in hass.data[DOMAIN].values()):
+        async_remove_broker(hass, data[API].account)
+    if not hass.data[DOMAIN]:
+        async_unload_services(hass)
+    return True
+
+
+async def async_remove_entry(hass, config_entry):
+    """Remove the cache of a deleted config entry."""
+    from .cache import STORAGE_KEY, TaipowerCache
+
+    await TaipowerCache(hass, f"{STORAGE_KEY}.{config_entry.entry_id}").async_remove()
+
+
 @dataclass
 class UpdateData:
     status_name : str
@@ -210,9 +262,14 @@ class UpdateData:
 
 
 class TaipowerEntity(CoordinatorEntity):
+    # Data domain of the meter the entity shows, see `SIGNAL_UPDATE`.
+    data_domain = None
+
     def __init__(self, meter, coordinator):
         super().__init__(coordinator)
         self._meter = meter
+        self._view = coordinator.view
+        self._last_shown = None
 
     @property
     def device_info(self) -> dict:
@@ -238,9 +295,47 @@ class TaipowerEntity(CoordinatorEntity):
     def unique_id(self):
         """Return the entity's unique id."""
         raise NotImplementedError
-    
-    def update(self):
-        """Update latest status"""
-        _LOGGER.debug(f"Manually writing new states to entities.")
-        for update_callback in self.coordinator._listeners:
-            update_callback()
\ No newline at end of file
+
+    def _update_from_view(self):
+        """Read what the entity shows from the meter's view, before its state is written."""
+
+    def _shown_state(self):
+        """Return what the entity shows, its state is only written again once that changed.
+
+        `None` writes the state on every update.
+        """
+        return None
+
+    @callback
+    def _async_write_view_state(self):
+        self._update_from_view()
+        shown = self._shown_state()
+        if shown is not None and shown == self._last_shown:
+            return
+        self._last_shown = shown
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._async_write_view_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to updates of the entity's meter and data domain."""
+        await super().async_added_to_hass()
+        self._update_from_view()
+        # Written by the platform once added.
+        self._last_shown = self._shown_state()
+        if self.data_domain is not None:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    SIGNAL_UPDATE.format(self._meter.number, self.data_domain),
+                    self._async_write_view_state,
+                )
+            )
+
+    @callback
+    def async_update_domain(self):
+        """Update latest status of the entities sharing this entity's meter and data domain."""
+        _LOGGER.debug(f"Manually writing new states to {self.data_domain} entities of meter {self._meter.number}.")
+        async_dispatcher_send(self.hass, SIGNAL_UPDATE.format(self._meter.number, self.data_domain))
\ No newline at end of file
@@ -0,0 +1,619 @@
+"""Taipower integration."""
+import asyncio
+import datetime
+import functools
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Union
+
+import aiohttp
+import async_timeout
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+from Taipower import DEVICE_ID, model, utility
+from Taipower.api import TaipowerAPI, TaipowerElectricMeter
+from Taipower.connection import (APP_VERSION, BASIC_AUTH, ENDPOINT,
+                                 TaipowerTokens)
+
+from .broker import TaipowerRequestBroker, TaipowerThrottled, async_get_broker
+from .const import (CONF_ACCOUNT, CONF_AMI_PERIOD, CONF_BLOCKING_CLIENT,
+                    CONF_DEVICES, CONF_ENDPOINT, CONF_MAX_CONCURRENCY,
+                    CONF_METER_TIMEOUT, CONF_PASSWORD, CONF_RETRY,
+                    DEFAULT_MAX_CONCURRENCY, DEFAULT_METER_TIMEOUT,
+                    DEFAULT_RETRY, TAIPOWER_TIME_ZONE)
+from .metrics import TaipowerMetrics, record_request, record_stale
+from .util import add_months, parse_ami_datetime
+
+_LOGGER = logging.getLogger(__name__)
+REQUEST_TIMEOUT = 10
+# Reauthenticate 2 hours (7200 seconds), which is regarded as logged out, before TaipowerTokens expiration.
+REAUTH_MARGIN = 7200
+# Upper bound of AMI query windows fetched by one incremental refresh.
+MAX_AMI_WINDOWS = 31
+# HTTP statuses of a backend throttling requests.
+THROTTLED_STATUSES = (429, 503)
+
+
+def create_api(hass, config, tokens=None, on_tokens_updated=None):
+    """Create a Taipower API client from the integration config.
+
+    `tokens` previously saved with `on_tokens_updated` let the client skip the
+    password login. Requests go through the account's `TaipowerRequestBroker`.
+    The blocking client manages its tokens and requests itself.
+    """
+    kwargs = {
+        "account": config.get(CONF_ACCOUNT),
+        "password": config.get(CONF_PASSWORD),
+        "electric_numbers": config.get(CONF_DEVICES),
+        "ami_period": config.get(CONF_AMI_PERIOD),
+        "max_retries": config.get(CONF_RETRY, DEFAULT_RETRY),
+    }
+    refresh_kwargs = {
+        "max_concurrency": config.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+        "meter_timeout": config.get(CONF_METER_TIMEOUT, DEFAULT_METER_TIMEOUT),
+    }
+    if config.get(CONF_BLOCKING_CLIENT, False):
+        _LOGGER.debug("Using the blocking Taipower API client.")
+        if config.get(CONF_ENDPOINT):
+            _LOGGER.warning("The blocking Taipower API client ignores the endpoint option.")
+        return TaipowerExecutorAPI(hass, **kwargs, **refresh_kwargs)
+    return TaipowerAsyncAPI(
+        async_get_clientsession(hass),
+        **kwargs,
+        **refresh_kwargs,
+        session=TaipowerSession(tokens, on_tokens_updated),
+        endpoint=config.get(CONF_ENDPOINT) or f"https://{ENDPOINT}",
+        broker=async_get_broker(hass, config.get(CONF_ACCOUNT)),
+    )
+
+
+class TaipowerSession:
+    """Taipower OAuth tokens of an account.
+
+    Tokens can be restored from a dict saved earlier, and `on_update` is called
+    with the new dict whenever they are renewed so they can be persisted.
+    """
+
+    def __init__(self, tokens : Optional[dict] = None, on_update=None) -> None:
+        self.tokens : Optional[TaipowerTokens] = TaipowerTokens(**tokens) if tokens else None
+        self.lock : asyncio.Lock = asyncio.Lock()
+        self._on_update = on_update
+
+    @property
+    def expires_soon(self) -> bool:
+        """Whether the tokens are missing or are regarded as logged out."""
+        return self.tokens is None or self.tokens.expiration - time.time() <= REAUTH_MARGIN
+
+    def update(self, tokens : TaipowerTokens) -> None:
+        """Set new tokens and notify the listener."""
+        self.tokens = tokens
+        if self._on_update is not None:
+            self._on_update(self.as_dict())
+
+    def as_dict(self) -> Optional[dict]:
+        """Return the tokens as a JSON serializable dict."""
+        if self.tokens is None:
+            return None
+        return {
+            "access_token": self.tokens.access_token,
+            "refresh_token": self.tokens.refresh_token,
+            "expiration": self.tokens.expiration,
+        }
+
+
+class TaipowerClient:
+    """Refreshes meters concurrently, each one bounded by its own timeout.
+
+    Subclasses provide `meters` and `async_refresh_meter`.
+    """
+
+    def __init__(self, max_concurrency : int = DEFAULT_MAX_CONCURRENCY, meter_timeout : float = DEFAULT_METER_TIMEOUT) -> None:
+        self.max_concurrency : int = max(1, max_concurrency)
+        self.meter_timeout : float = meter_timeout
+        self.metrics : TaipowerMetrics = TaipowerMetrics()
+        # Shared by every caller so per-meter coordinators respect the limit together.
+        self._semaphore : asyncio.Semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def meters(self) -> Dict[str, TaipowerElectricMeter]:
+        """Picked Taipower electric meters."""
+        raise NotImplementedError
+
+    @property
+    def tokens(self) -> Optional[dict]:
+        """Current tokens that can be saved for a later session, if supported."""
+        return None
+
+    @property
+    def meter_data(self) -> List[dict]:
+        """Metadata of the picked meters that can be saved for `restore_meters`."""
+        return [meter._json for meter in self.meters.values()]
+
+    def restore_meters(self, meter_data : List[dict]) -> bool:
+        """Pick meters from saved metadata without logging in, returning whether it is supported."""
+        return False
+
+    async def _async_prepare_refresh(self) -> None:
+        """Hook run once before meters are refreshed."""
+
+    async def async_refresh_meter(self, electric_number : str, **kwargs) -> None:
+        """Refresh a single meter, raising on any error."""
+        raise NotImplementedError
+
+    async def async_get_ami(self, electric_number : str, dt : Optional[datetime.datetime] = None) -> Dict[str, model.TaipowerAMI]:
+        """Get AMI of the configured period around `dt`, by default now."""
+        raise NotImplementedError
+
+    def _ami_windows(self, start : datetime.datetime, end : datetime.datetime) -> List[datetime.datetime]:
+        """Return one datetime per AMI query window (day, month or year) from `start` to `end`."""
+        current = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.ami_period == "daily":
+            current = current.replace(day=1)
+        elif self.ami_period == "monthly":
+            current = current.replace(month=1, day=1)
+
+        windows = []
+        while current <= end:
+            windows.append(current)
+            if self.ami_period == "daily":
+                current = add_months(current, 1)
+            elif self.ami_period == "monthly":
+                current = current.replace(year=current.year + 1)
+            else:
+                current += datetime.timedelta(days=1)
+        return windows[-MAX_AMI_WINDOWS:]
+
+    async def async_get_ami_since(self, electric_number : str, since : Optional[str] = None) -> Dict[str, model.TaipowerAMI]:
+        """Get AMI records ending at or after `since`, a `yyyymmddHHMMSS` end time.
+
+        Only the query windows from the one holding `since` up to now are
+        requested, so the newest known record is fetched again in case it
+        changed. Without `since`, only the current window is requested.
+        """
+        now = dt_util.now(dt_util.get_time_zone(TAIPOWER_TIME_ZONE))
+        if since is None:
+            return await self.async_get_ami(electric_number, now)
+
+        windows = self._ami_windows(parse_ami_datetime(since) - datetime.timedelta(seconds=1), now)
+        results = await asyncio.gather(
+            *[self.async_get_ami(electric_number, window) for window in windows]
+        )
+        records = {}
+        for result in results:
+            for start_time, record in result.items():
+                if record.end_time >= since:
+                    records[start_time] = record
+        return records
+
+    async def async_fetch_ami_since(
+        self,
+        electric_number : str,
+        since : Optional[str] = None,
+        timeout : Optional[float] = None,
+    ) -> Dict[str, model.TaipowerAMI]:
+        """Fetch the AMI records of a meter ending at or after `since`.
+
+        Runs within the concurrency limit and `timeout` like a meter of
+        `async_refresh_status`, but returns the records instead of setting
+        `meter.ami`, so callers merge them into the meter's history.
+        """
+        timeout = self.meter_timeout if timeout is None else timeout
+        async with async_timeout.timeout(timeout):
+            await self._async_prepare_refresh()
+        async with self._semaphore:
+            async with async_timeout.timeout(timeout):
+                if not self.meters[electric_number].number_verified:
+                    return {}
+                return await self.async_get_ami_since(electric_number, since)
+
+    async def async_refresh_status(
+        self,
+        electric_number : Optional[str] = None,
+        timeout : Optional[float] = None,
+        **kwargs,
+    ) -> Dict[str, Exception]:
+        """Refresh meters concurrently.
+
+        A meter that fails or exceeds `timeout` (`meter_timeout` by default) does
+        not affect the others; its error is returned keyed by electric number.
+        The timeout of a meter starts once it is let through the concurrency
+        limit, so meters queued behind others do not time out waiting.
+        """
+        timeout = self.meter_timeout if timeout is None else timeout
+        async with async_timeout.timeout(timeout):
+            await self._async_prepare_refresh()
+
+        async def _async_refresh(number):
+            async with self._semaphore:
+                async with async_timeout.timeout(timeout):
+                    await self.async_refresh_meter(number, **kwargs)
+
+        numbers = [
+            number for number in self.meters
+            if electric_number is None or number == electric_number
+        ]
+        results = await asyncio.gather(
+            *[_async_refresh(number) for number in numbers], return_exceptions=True
+        )
+        return {
+            number: result
+            for number, result in zip(numbers, results)
+            if isinstance(result, Exception)
+        }
+
+
+class TaipowerAsyncAPI(TaipowerClient):
+    """Taipower API talking to the backend with Home Assistant's shared aiohttp session.
+
+    Mirrors `Taipower.api.TaipowerAPI`, but awaits network I/O on the event loop
+    instead of running `asyncio.run` inside an executor thread.
+    """
+
+    def __init__(
+        self,
+        client_session : aiohttp.ClientSession,
+        account : str,
+        password : str,
+        electric_numbers : Optional[Union[List[str], str]] = None,
+        ami_period : str = "daily",
+        max_retries : int = 5,
+        session : Optional[TaipowerSession] = None,
+        endpoint : str = f"https://{ENDPOINT}",
+        broker : Optional[TaipowerRequestBroker] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+
+        if ami_period not in ["quater", "hour", "daily", "monthly"]:
+            raise ValueError("ami_period accepts either `quater`, `hour`, `daily` or `monthly`.")
+
+        self.account : str = account
+        self.password : str = password
+        self.electric_numbers : Optional[Union[List[str], str]] = electric_numbers
+        self.ami_period : str = ami_period
+        self.max_retries : int = max_retries
+
+        self.session : TaipowerSession = session or TaipowerSession()
+        self.endpoint : str = endpoint.rstrip("/")
+        self.broker : TaipowerRequestBroker = broker or TaipowerRequestBroker()
+
+        self._client_session : aiohttp.ClientSession = client_session
+        self._meters : Dict[str, TaipowerElectricMeter] = {}
+
+    @property
+    def meters(self) -> Dict[str, TaipowerElectricMeter]:
+        """Picked Taipower electric meters."""
+        return self._meters
+
+    @property
+    def tokens(self) -> Optional[dict]:
+        return self.session.as_dict()
+
+    def restore_meters(self, meter_data : List[dict]) -> bool:
+        self._meters = {meter["electricNumber"]: TaipowerElectricMeter(meter) for meter in meter_data}
+        return True
+
+    async def _async_prepare_refresh(self) -> None:
+        await self._async_check_before_publish()
+
+    def _generate_headers(self, token_type="bearer") -> dict:
+        if token_type == "bearer":
+            auth = f"Bearer {self.session.tokens.access_token}"
+        else:
+            auth = f"Basic {BASIC_AUTH}"
+        return {
+            "Accept": "*",
+            "Authorization": auth,
+            "User-Agent": "Mozilla/5.0 ( compatible )"
+        }
+
+    @staticmethod
+    def _handle_response(status_code, response_json, api_name):
+        if status_code == 200:
+            if "success" in response_json and "message" in response_json:
+                if response_json["success"] == True:
+                    if api_name == "applyCase/amiUnbillData" and response_json["data"]["ami"] == False:
+                        return "No AMI unbilled data", response_json
+                    return "OK", response_json
+                return response_json["message"], response_json
+            return "OK", response_json
+        elif "error" in response_json:
+            if "error_description" in response_json:
+                return f"{response_json['error_description']}", response_json
+            return f"{response_json['error']} {response_json}", response_json
+        return "Unknown error", response_json
+
+    async def _async_post(self, api_name, token_type="bearer", **kwargs):
+        """Post to a Taipower endpoint through the account's broker.
+
+        Identical requests of the account in flight are sent once. While the
+        backend throttles, data requests get the last good response of their
+        endpoint and meter, whatever AMI window it was for, and the refresh
+        being traced is marked stale.
+        """
+        key = (api_name, json.dumps(kwargs, sort_keys=True, default=str))
+        cache_key = None
+        if api_name != "oauth/token":
+            body = kwargs.get("json") or {}
+            cache_key = (api_name, body.get("custNo") or body.get("customNo"))
+        result, stale_since = await self.broker.async_request(
+            key,
+            functools.partial(self._async_send, api_name, token_type, **kwargs),
+            cache_key=cache_key,
+        )
+        if stale_since is not None:
+            _LOGGER.debug(f"Serving {api_name} fetched at {stale_since} while throttled.")
+            record_stale(stale_since)
+        return result
+
+    async def _async_send(self, api_name, token_type="bearer", **kwargs):
+        """Post to a Taipower endpoint.
+
+        Transport errors are retried up to `max_retries` times. A rejected access
+        token is renewed and the request retried once. Raises `TaipowerThrottled`
+        if the backend throttles.
+        """
+        headers = self._generate_headers(token_type)
+        attempt = 0
+        renewed = False
+        payload_bytes = 0
+        while True:
+            try:
+                async with self._client_session.post(
+                    f"{self.endpoint}/{api_name}",
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                    **kwargs,
+                ) as response:
+                    body = await response.read()
+                    status_code = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                attempt += 1
+                if attempt > self.max_retries:
+                    record_request(payload_bytes, 0.0, self.max_retries + renewed)
+                    raise RuntimeError(f"An error occurred when connecting to Taipower API: {err!r}") from err
+                _LOGGER.debug(f"Retrying {api_name} ({attempt}/{self.max_retries}): {err!r}")
+                continue
+
+            if status_code in THROTTLED_STATUSES:
+                retry_after = response.headers.get("Retry-After", "")
+                raise TaipowerThrottled(int(retry_after) if retry_after.isdigit() else None)
+
+            payload_bytes += len(body)
+            start = time.perf_counter()
+            try:
+                response_json = json.loads(body)
+            except ValueError:
+                response_json = None
+            parse_seconds = time.perf_counter() - start
+
+            if status_code == 401 and token_type == "bearer" and not renewed:
+                _LOGGER.debug(f"Access token rejected by {api_name}, renewing tokens.")
+                await self._async_handle_auth_failure(headers["Authorization"])
+                headers = self._generate_headers(token_type)
+                renewed = True
+                continue
+            record_request(payload_bytes, parse_seconds, attempt + renewed)
+            if not isinstance(response_json, dict):
+                raise RuntimeError(f"An error occurred when connecting to Taipower API: {api_name} returned {status_code} without a JSON object body")
+            return self._handle_response(status_code, response_json, api_name)
+
+    async def _async_request_tokens(self, use_refresh_token=False):
+        if use_refresh_token and self.session.tokens is not None:
+            login_data = {
+                "refresh_token": self.session.tokens.refresh_token,
+                "grant_type": "refresh_token",
+            }
+        else:
+            login_data = {
+                "username": self.account,
+                "password": utility.des_encrypt(self.password),
+                "grant_type": "password",
+                "scope": "tpec",
+                "device_id": DEVICE_ID,
+                "appVersion": APP_VERSION,
+            }
+        start = time.perf_counter()
+        status, response = await self._async_post("oauth/token", token_type="basic", data=login_data)
+        self.metrics.record_login(time.perf_counter() - start)
+
+        if status != "OK" or response.get("token_type") != "bearer":
+            raise RuntimeError(f"An error occurred when signing into Taipower API: {status}")
+        self.session.update(
+            TaipowerTokens(
+                access_token=response["access_token"],
+                refresh_token=response["refresh_token"],
+                expiration=time.time() + response["expires_in"],
+            )
+        )
+
+    async def _async_renew_tokens(self):
+        """Renew tokens with the refresh token, falling back to a password login."""
+        if self.session.tokens is not None:
+            try:
+                await self._async_request_tokens(use_refresh_token=True)
+                return
+            except RuntimeError as err:
+                _LOGGER.debug(f"Failed to renew tokens with the refresh token: {err}")
+        await self._async_request_tokens()
+
+    async def _async_check_before_publish(self) -> None:
+        async with self.session.lock:
+            if self.session.expires_soon:
+                await self._async_renew_tokens()
+
+    async def _async_handle_auth_failure(self, authorization) -> None:
+        async with self.session.lock:
+            # Another request may have renewed the tokens already.
+            if authorization == self._generate_headers()["Authorization"]:
+                await self._async_renew_tokens()
+
+    async def async_login(self, refresh : bool = True) -> None:
+        """Login API and pick electric meters, refreshing their status if `refresh` is set.
+
+        Raises RuntimeError on login errors and AssertionError if some of
+        `electric_numbers` are not available from the API. Saved tokens are
+        reused, and only renewed if they are about to expire. Meters picked
+        before, e.g. restored ones, are kept along with their data.
+        """
+        await self._async_check_before_publish()
+        status, response = await self._async_post("member/getData", json=None)
+        if status != "OK":
+            raise RuntimeError(f"An error occurred when retrieving electric meters: {status}")
+
+        meters = TaipowerElectricMeter.from_electric_meter_list(response, self.electric_numbers)
+        for number, meter in meters.items():
+            if number in self._meters:
+                self._meters[number]._json = meter._json
+                meters[number] = self._meters[number]
+        self._meters = meters
+
+        if not refresh:
+            return
+        try:
+            await self.async_refresh_status() # suppress errors when login
+        except Exception as err:
+            _LOGGER.debug(f"Suppressed error when refreshing status on login: {err}")
+
+    async def async_reauth(self, use_refresh_token : bool = False) -> None:
+        """Reauthenticate with Taipower API to retrieve new tokens."""
+        async with self.session.lock:
+            await self._async_request_tokens(use_refresh_token)
+
+    async def async_get_ami(self, electric_number : str, dt : Optional[datetime.datetime] = None) -> Dict[str, model.TaipowerAMI]:
+        """Get AMI of the configured period around `dt`, by default now."""
+        if dt is None:
+            dt = datetime.datetime.now()
+
+        if self.ami_period in ["hour", "quater"]:
+            time_text, time_rep = "date", dt.strftime("%Y%m%d")
+        elif self.ami_period == "daily":
+            time_text, time_rep = "yearMonth", dt.strftime("%Y%m")
+        else:
+            time_text, time_rep = "year", dt.strftime("%Y")
+
+        status, response = await self._async_post(
+            f"api/ami/{self.ami_period}",
+            json={"custNo": electric_number, time_text: time_rep},
+        )
+        if status != "OK":
+            raise RuntimeError(f"An error occurred when retrieving AMI: {status}")
+        return model.TaipowerAMI.from_amis(response)
+
+    async def async_get_ami_bill(self, electric_number : str) -> model.TaipowerAMIBill:
+        """Get AMI bill."""
+        status, response = await self._async_post(
+            "api/home/bills",
+            json={"phoneNo": self.account, "deviceId": "", "customNo": electric_number},
+        )
+        if status != "OK":
+            raise RuntimeError(f"An error occurred when retrieving AMI bill: {status}")
+        return model.TaipowerAMIBill(response["data"])
+
+    async def async_get_ami_unbilled(self, electric_number : str) -> model.TaipowerAMIUnbilled:
+        """Get AMI unbilled."""
+        status, response = await self._async_post(
+            "applyCase/amiUnbillData",
+            json={"customNo": electric_number, "forPrepaid": False},
+        )
+        if status != "OK":
+            raise RuntimeError(f"An error occurred when retrieving AMI unbilled: {status}")
+        return model.TaipowerAMIUnbilled(response["data"])
+
+    async def async_get_bill_records(self, electric_number : str) -> Dict[str, model.TaipowerBillRecord]:
+        """Get bill records."""
+        status, response = await self._async_post(
+            "api/mybill/records",
+            json={"customNo": electric_number},
+        )
+        if status != "OK":
+            raise RuntimeError(f"An error occurred when retrieving bill records: {status}")
+        return model.TaipowerBillRecord.from_bill_records(response)
+
+    async def async_refresh_meter(
+        self,
+        electric_number : str,
+        refresh_ami : bool = True,
+        refresh_ami_bill : bool = True,
+        refresh_ami_unbilled : bool = True,
+        refresh_bill_records : bool = True,
+    ) -> None:
+        """Refresh status of a meter from Taipower API.
+
+        Raises a RuntimeError containing all errors if any request fails.
+        """
+        meter = self._meters[electric_number]
+        requests = []
+        attributes = []
+        if refresh_ami and meter.number_verified:
+            requests.append(self.async_get_ami(electric_number))
+            attributes.append("ami")
+        if refresh_ami_bill:
+            requests.append(self.async_get_ami_bill(electric_number))
+            attributes.append("ami_bill")
+        if refresh_ami_unbilled:
+            requests.append(self.async_get_ami_unbilled(electric_number))
+            attributes.append("ami_unbilled")
+        if refresh_bill_records:
+            requests.append(self.async_get_bill_records(electric_number))
+            attributes.append("bill_records")
+
+        errors = []
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        for result, attribute in zip(results, attributes):
+            if isinstance(result, Exception):
+                errors.append(result)
+            else:
+                setattr(meter, attribute, result)
+
+        if len(errors) != 0:
+            raise RuntimeError(errors)
+
+
+class TaipowerExecutorAPI(TaipowerClient):
+    """Blocking `Taipower.api.TaipowerAPI` driven through the Home Assistant executor.
+
+    Requests are made inside the library, so refreshes are only traced as a
+    whole, without payload sizes, parse times and retries.
+    """
+
+    def __init__(self, hass, max_concurrency=DEFAULT_MAX_CONCURRENCY, meter_timeout=DEFAULT_METER_TIMEOUT, **kwargs) -> None:
+        super().__init__(max_concurrency, meter_timeout)
+        self._hass = hass
+        self._api = TaipowerAPI(**kwargs)
+
+    @property
+    def meters(self) -> Dict[str, TaipowerElectricMeter]:
+        """Picked Taipower electric meters."""
+        return self._api.meters
+
+    @property
+    def ami_period(self) -> str:
+        """The retrieved AMI period."""
+        return self._api.ami_period
+
+    @property
+    def max_retries(self) -> int:
+        """Maximum number of retries of a request."""
+        return self._api.max_retries
+
+    async def async_login(self, refresh : bool = True) -> None:
+        """Login API. The blocking client always refreshes status on login."""
+        start = time.perf_counter()
+        await self._hass.async_add_executor_job(self._api.login)
+        self.metrics.record_login(time.perf_counter() - start)
+
+    async def _async_prepare_refresh(self) -> None:
+        # `get_ami` does not check the tokens like `refresh_status` does.
+        await self._hass.async_add_executor_job(self._api._check_before_publish)
+
+    async def async_get_ami(self, electric_number : str, dt : Optional[datetime.datetime] = None) -> Dict[str, model.TaipowerAMI]:
+        """Get AMI of the configured period around `dt`, by default now."""
+        return await self._hass.async_add_executor_job(self._api.get_ami, electric_number, dt)
+
+    async def async_refresh_meter(self, electric_number : str, **kwargs) -> None:
+        """Refresh status of a meter from Taipower API."""
+        await self._hass.async_add_executor_job(
+            functools.partial(self._api.refresh_status, electric_number=electric_number, **kwargs)
+        )
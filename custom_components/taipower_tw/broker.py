@@ -0,0 +1,145 @@
+"""Taipower integration."""
+import asyncio
+import collections
+import logging
+import time
+
+from .const import BROKERS
+
+_LOGGER = logging.getLogger(__name__)
+# Sustained requests per second and burst size allowed per account.
+RATE_LIMIT = 5.0
+BURST = 20
+# Pause after the backend throttles without telling for how long, in seconds.
+THROTTLE_BACKOFF = 60
+
+
+class TaipowerThrottled(Exception):
+    """The backend rejected a request for exceeding its rate limit."""
+
+    def __init__(self, retry_after=None):
+        super().__init__(f"Throttled by Taipower API, retry after {retry_after or THROTTLE_BACKOFF} seconds")
+        self.retry_after = retry_after
+
+
+class TaipowerRequestBroker:
+    """Sends the requests of an account, whichever client makes them.
+
+    Identical requests in flight are coalesced into a single one whose result
+    every caller gets, and requests are started no faster than a token bucket
+    of `rate` tokens per second holding up to `burst` tokens allows. When the
+    backend throttles, it is left alone until it allows requests again, and
+    requests with a cache key are answered with the last good result of that
+    key meanwhile, together with the time it was fetched so callers know it is
+    stale. Only the latest result per cache key is kept.
+    """
+
+    def __init__(self, rate=RATE_LIMIT, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.throttled_until = 0.0
+        self.requests = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.stale_served = 0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._bucket_lock = asyncio.Lock()
+        self._in_flight = {}
+        self._waiters = collections.Counter()
+        self._last_good = {}
+
+    async def _async_acquire(self):
+        """Wait for a token of the bucket."""
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def _async_send(self, request, cache_key):
+        remaining = self.throttled_until - time.monotonic()
+        if remaining > 0:
+            raise TaipowerThrottled(round(remaining))
+
+        await self._async_acquire()
+        self.requests += 1
+        try:
+            result = await request()
+        except TaipowerThrottled as err:
+            self.throttled += 1
+            self.throttled_until = time.monotonic() + (err.retry_after or THROTTLE_BACKOFF)
+            _LOGGER.warning(f"Taipower API is throttling requests, pausing for {err.retry_after or THROTTLE_BACKOFF} seconds.")
+            raise
+        if cache_key is not None and result[0] == "OK":
+            self._last_good[cache_key] = (result, time.time())
+        return result
+
+    async def async_request(self, key, request, cache_key=None):
+        """Return the result of `request`, a coroutine function, and when it was fetched if stale.
+
+        Requests with equal `key` in flight share a single call. Throttled
+        requests without a last good result for `cache_key` raise `RuntimeError`.
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._async_send(request, cache_key))
+            self._in_flight[key] = future
+
+            def _done(future):
+                self._in_flight.pop(key, None)
+                if not future.cancelled():
+                    # Retrieved here too in case every caller gave up waiting.
+                    future.exception()
+
+            future.add_done_callback(_done)
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            # Shielded so a caller timing out does not cancel the request for
+            # the others, it is only cancelled once nobody waits for it.
+            return await asyncio.shield(future), None
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1:
+                future.cancel()
+            raise
+        except TaipowerThrottled as err:
+            if cache_key not in self._last_good:
+                raise RuntimeError(f"An error occurred when connecting to Taipower API: {err}") from err
+            self.stale_served += 1
+            result, fetched_at = self._last_good[cache_key]
+            return result, fetched_at
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def as_dict(self):
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "throttled_for": max(self.throttled_until - time.monotonic(), 0),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "throttled": self.throttled,
+            "stale_served": self.stale_served,
+        }
+
+
+def async_get_broker(hass, account):
+    """Return the request broker shared by every client of an account."""
+    brokers = hass.data.setdefault(BROKERS, {})
+    if account not in brokers:
+        brokers[account] = TaipowerRequestBroker()
+    return brokers[account]
+
+
+def async_remove_broker(hass, account):
+    """Drop the request broker of an account no client uses anymore."""
+    hass.data.get(BROKERS, {}).pop(account, None)
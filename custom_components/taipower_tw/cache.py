@@ -0,0 +1,172 @@
+"""Taipower integration."""
+import asyncio
+import logging
+import time
+
+from homeassistant.helpers.storage import Store
+from Taipower import model
+
+from .const import DOMAIN
+from .history import AMIHistory
+
+_LOGGER = logging.getLogger(__name__)
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.cache"
+SAVE_DELAY = 60
+# Number of AMI records kept per meter and period, roughly a month of quarters,
+# a quarter of hours, two years of days and ten years of months.
+AMI_RETENTION = {
+    "quater": 96 * 31,
+    "hour": 24 * 92,
+    "daily": 731,
+    "monthly": 120,
+}
+
+
+class TaipowerCache:
+    """Persistent store of AMI history, AMI unbilled and bill records.
+
+    Data are kept as the raw API payloads, keyed by electric number and, for
+    AMI, by period and `start_time`. Historical AMI periods never change, so
+    restoring them at startup leaves only the newest periods to be fetched.
+    AMI unbilled and bill records are kept with the time they were fetched, so
+    outdated ones are refreshed at startup.
+    """
+
+    def __init__(self, hass, key=STORAGE_KEY):
+        self._store = Store(hass, STORAGE_VERSION, key)
+        self._meters = {}
+
+    async def async_load(self):
+        """Load the cache from disk."""
+        data = await self._store.async_load()
+        self._meters = data.get("meters", {}) if data else {}
+        _LOGGER.debug(f"Loaded cached data of {list(self._meters)}.")
+
+    async def async_flush(self):
+        """Write the cache to disk now, e.g. before unloading."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self):
+        """Remove the cache from disk."""
+        await self._store.async_remove()
+
+    def _data_to_save(self):
+        return {"meters": self._meters}
+
+    def _meter_data(self, electric_number):
+        return self._meters.setdefault(
+            electric_number,
+            {"ami": {}, "ami_unbilled": None, "bill_records": None, "bill_fetched_at": None},
+        )
+
+    def has_meter(self, electric_number, ami_period):
+        """Return whether AMI history of the meter and period is cached."""
+        return bool(self._meters.get(electric_number, {}).get("ami", {}).get(ami_period))
+
+    def bill_fetched_at(self, electric_number):
+        """Return when AMI unbilled and bill records of the meter were last fetched, as a timestamp."""
+        return self._meters.get(electric_number, {}).get("bill_fetched_at")
+
+    def restore(self, meter, ami_period):
+        """Populate a meter with cached data, keeping data it already holds."""
+        data = self._meters.get(meter.number)
+        if data is None:
+            return
+        ami = data["ami"].get(ami_period)
+        if ami:
+            history = AMIHistory(
+                {start_time: model.TaipowerAMI(record) for start_time, record in ami.items()}
+            )
+            self.merge_ami(meter.number, ami_period, history, meter.ami)
+            meter.ami = history
+        if meter.ami_unbilled is None and data["ami_unbilled"] is not None:
+            meter.ami_unbilled = model.TaipowerAMIUnbilled(data["ami_unbilled"])
+        if meter.bill_records is None and data["bill_records"] is not None:
+            meter.bill_records = {
+                month: model.TaipowerBillRecord(record)
+                for month, record in data["bill_records"].items()
+            }
+
+    def restore_meters(self, api):
+        """Restore every cached meter of the API, returning the uncached ones."""
+        uncached = []
+        for number, meter in api.meters.items():
+            hit = self.has_meter(number, api.ami_period)
+            api.metrics.record_cache(number, hit)
+            if hit:
+                self.restore(meter, api.ami_period)
+            else:
+                uncached.append(number)
+        return uncached
+
+    async def async_fetch(self, api, uncached):
+        """Fetch everything for uncached meters.
+
+        Returns the electric numbers that were fetched successfully. Errors,
+        including those preparing the refresh such as a failed token renewal,
+        only leave a meter out.
+        """
+        results = await asyncio.gather(
+            *[
+                api.async_refresh_status(electric_number=number, refresh_ami_bill=False)
+                for number in uncached
+            ],
+            return_exceptions=True,
+        )
+        fetched = []
+        for number, errors in zip(uncached, results):
+            if isinstance(errors, BaseException):
+                errors = {number: errors}
+            if errors:
+                _LOGGER.debug(f"Suppressed error when fetching uncached meter {number}: {errors[number]!r}")
+            else:
+                fetched.append(number)
+            meter = api.meters[number]
+            history = AMIHistory()
+            self.merge_ami(number, api.ami_period, history, meter.ami)
+            meter.ami = history
+            self.update_bill(meter)
+        return fetched
+
+    def merge_ami(self, electric_number, ami_period, history, fresh):
+        """Merge freshly fetched AMI records into `history` and the cache.
+
+        Only added or changed records are written to the cache. Returns their keys.
+        """
+        changed = history.merge(fresh or {})
+        removed = history.trim(AMI_RETENTION[ami_period])
+        if not changed and not removed:
+            return changed
+
+        cached = self._meter_data(electric_number)["ami"].setdefault(ami_period, {})
+        for key in changed:
+            if key in history:
+                cached[key] = history[key]._json
+        for key in removed:
+            cached.pop(key, None)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return changed
+
+    def update_bill(self, meter):
+        """Cache AMI unbilled and bill records of a meter, returning whether they changed.
+
+        Once the meter holds both, they are marked as fetched now, which is
+        saved even if they are unchanged.
+        """
+        data = self._meter_data(meter.number)
+        changed = False
+        fetched = meter.ami_unbilled is not None and meter.bill_records is not None
+        if fetched:
+            data["bill_fetched_at"] = time.time()
+        if meter.ami_unbilled is not None and data["ami_unbilled"] != meter.ami_unbilled._json:
+            data["ami_unbilled"] = meter.ami_unbilled._json
+            changed = True
+        if meter.bill_records is not None:
+            bill_records = {month: record._json for month, record in meter.bill_records.items()}
+            if data["bill_records"] != bill_records:
+                data["bill_records"] = bill_records
+                changed = True
+        if changed or fetched:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return changed
@@ -4,25 +4,33 @@ import logging
 from homeassistant import config_entries
 
 from .const import (CONF_ACCOUNT, CONF_ADD_ANOTHER_METER, CONF_AMI_PERIOD,
-                    CONF_DEVICES, CONF_PASSWORD, CONF_RETRY,
+                    CONF_BLOCKING_CLIENT, CONF_DEVICES, CONF_METERS,
+                    CONF_PASSWORD, CONF_RETRY, CONF_TOKENS,
                     CONFIG_FLOW_ADD_METER_SCHEMA, CONFIG_FLOW_SCHEMA, DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
-from Taipower.api import TaipowerAPI
 
+async def validate_auth(hass, account, password, electric_numbers, ami_period, max_retries, blocking_client=False):
+    """Validates Taipower account and meters, returning the logged in client."""
+    # The client library is only loaded once an account is actually set up.
+    from .api import create_api
 
-async def validate_auth(hass, account, password, electric_numbers, ami_period, max_retries) -> None:
-    """Validates Taipower account and meters."""
-
-    api = TaipowerAPI(
-        account=account,
-        password=password,
-        electric_numbers=electric_numbers,
-        ami_period=ami_period,
-        max_retries=max_retries,
+    api = create_api(
+        hass,
+        {
+            CONF_ACCOUNT: account,
+            CONF_PASSWORD: password,
+            CONF_DEVICES: electric_numbers,
+            CONF_AMI_PERIOD: ami_period,
+            CONF_RETRY: max_retries,
+            CONF_BLOCKING_CLIENT: blocking_client,
+        }
     )
-    await hass.async_add_executor_job(api.login)
+    # Only the tokens and meter metadata are kept, the meters' data are
+    # fetched once the entry is set up. The blocking client ignores this.
+    await api.async_login(refresh=False)
+    return api
 
 
 class TaipowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -54,13 +62,14 @@ class TaipowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 user_input[CONF_AMI_PERIOD] = "quater"
 
             try:
-                await validate_auth(
+                api = await validate_auth(
                     self.hass,
                     user_input[CONF_ACCOUNT],
                     user_input[CONF_PASSWORD],
                     user_input[CONF_DEVICES],
                     user_input[CONF_AMI_PERIOD],
                     user_input[CONF_RETRY],
+                    user_input.get(CONF_BLOCKING_CLIENT, False),
                 )
             except AssertionError as err:
                 _LOGGER.error(f"Assertion check error: {err}")
@@ -76,7 +85,9 @@ class TaipowerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return self.async_create_entry(
                     title="Taipower TW",
                     data={
-                        DOMAIN: user_input
+                        DOMAIN: user_input,
+                        CONF_TOKENS: api.tokens,
+                        CONF_METERS: api.meter_data,
                     }
                 )
         return self.async_show_form(
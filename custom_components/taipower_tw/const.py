@@ -3,18 +3,51 @@ import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant.const import CONF_DEVICES, CONF_PASSWORD
 
+from .tariff import TARIFF_TIERED, TARIFFS
+
 DOMAIN = "taipower_tw"
 API = "api"
 COORDINATOR = "coordinator"
-MONTH_KEY = "month_key"
-AMI_KEY = "ami_key"
+BILL_COORDINATOR = "bill_coordinator"
+CACHE = "cache"
+# Key of the runtime data set up from configuration.yaml, config entries using their entry id.
+YAML_DATA = "yaml"
+# Request brokers per account, kept apart from the integration data so every
+# client of an account shares one, config flows included.
+BROKERS = f"{DOMAIN}_brokers"
+TAIPOWER_TIME_ZONE = "Asia/Taipei"
+
+# Data domains of a meter, each with its own update signal.
+DATA_AMI = "ami"
+DATA_UNBILLED = "unbilled"
+DATA_BILL = "bill"
+DATA_METRICS = "metrics"
+SIGNAL_UPDATE = f"{DOMAIN}_update_{{}}_{{}}"
+
+SERVICE_GET_AMI_RANGE = "get_ami_range"
+ATTR_ELECTRIC_NUMBER = "electric_number"
+ATTR_PERIOD = "period"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_RECORDS = "records"
 
 CONF_ACCOUNT = "account"
 CONF_RETRY = "retry"
 CONF_AMI_PERIOD = "ami_period"
 CONF_ADD_ANOTHER_METER = "add_another_meter"
+CONF_BLOCKING_CLIENT = "blocking_client"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_METER_TIMEOUT = "meter_timeout"
+CONF_TOKENS = "tokens"
+# Metadata of the picked meters saved in config entries, see `TaipowerClient.meter_data`.
+CONF_METERS = "meters"
+CONF_TARIFF = "tariff"
+CONF_ENDPOINT = "endpoint"
 DEFAULT_RETRY = 5
 DEFAULT_AMI_PERIOD = "daily"
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_METER_TIMEOUT = 15
+DEFAULT_TARIFF = TARIFF_TIERED
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -25,6 +58,12 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Optional(CONF_RETRY, default=DEFAULT_RETRY): cv.positive_int,
                 vol.Optional(CONF_DEVICES, default=[]): vol.All(cv.ensure_list, list),
                 vol.Optional(CONF_AMI_PERIOD, default=DEFAULT_AMI_PERIOD): cv.string,
+                vol.Optional(CONF_BLOCKING_CLIENT, default=False): cv.boolean,
+                vol.Optional(CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY): cv.positive_int,
+                vol.Optional(CONF_METER_TIMEOUT, default=DEFAULT_METER_TIMEOUT): cv.positive_int,
+                vol.Optional(CONF_TARIFF, default=DEFAULT_TARIFF): vol.In(TARIFFS),
+                # Base URL of a stand-in Taipower API, see scripts/mock_server.py.
+                vol.Optional(CONF_ENDPOINT): cv.url,
             }
         )
     },
@@ -38,6 +77,10 @@ CONFIG_FLOW_SCHEMA = vol.Schema(
         vol.Optional(CONF_RETRY, default=DEFAULT_RETRY): cv.positive_int,
         vol.Optional(CONF_DEVICES, default=""): cv.string,
         vol.Optional(CONF_AMI_PERIOD, default=DEFAULT_AMI_PERIOD): cv.string,
+        vol.Optional(CONF_BLOCKING_CLIENT, default=False): cv.boolean,
+        vol.Optional(CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY): cv.positive_int,
+        vol.Optional(CONF_METER_TIMEOUT, default=DEFAULT_METER_TIMEOUT): cv.positive_int,
+        vol.Optional(CONF_TARIFF, default=DEFAULT_TARIFF): vol.In(TARIFFS),
         vol.Optional(CONF_ADD_ANOTHER_METER, default=False): cv.boolean,
     }
 )
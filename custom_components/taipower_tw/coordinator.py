@@ -0,0 +1,315 @@
+"""Taipower integration."""
+import asyncio
+import datetime
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import (DataUpdateCoordinator,
+                                                      UpdateFailed)
+from homeassistant.util import dt as dt_util
+
+from .const import (DATA_AMI, DATA_BILL, DATA_METRICS, DATA_UNBILLED, DOMAIN,
+                    SIGNAL_UPDATE, TAIPOWER_TIME_ZONE)
+from .history import AMIHistory
+from .scheduler import AMIPollScheduler
+from .statistics import TaipowerStatistics
+from .tariff import TARIFF_TIERED
+from .util import parse_date
+from .view import TaipowerMeterView
+
+_LOGGER = logging.getLogger(__name__)
+DATA_UPDATE_INTERVAL = timedelta(minutes=30)
+BILL_UPDATE_INTERVAL = timedelta(hours=12)
+MAX_UPDATE_INTERVAL = timedelta(hours=6)
+# Failures past this many no longer double the interval, which is capped long
+# before, so the interval cannot overflow.
+MAX_BACKOFF_EXPONENT = 10
+# Bill and unbilled data of a reading date show up some hours after midnight.
+BILL_PUBLICATION_DELAY = timedelta(hours=6)
+BILL_TIMEOUT = 30
+
+
+class TaipowerCoordinator(DataUpdateCoordinator):
+    """Polls one tier of a single electric meter on its own schedule.
+
+    Failures only affect the entities of this meter and tier, and back the
+    polling interval off exponentially until the next successful refresh.
+    Every refresh is traced into the API's metrics, see `TaipowerMetrics`.
+    """
+
+    tier = None
+    # Arguments of `async_refresh_status`.
+    refresh_kwargs = {}
+
+    def __init__(self, hass, api, cache, electric_number, view, update_interval, timeout, **kwargs):
+        super().__init__(
+            hass,
+            _LOGGER,
+            # Name of the data. For logging purposes.
+            name=f"{DOMAIN} {electric_number} {self.tier}",
+            # Polling interval. Will only be polled if there are subscribers.
+            update_interval=update_interval,
+            **kwargs,
+        )
+        self.api = api
+        self.cache = cache
+        self.electric_number = electric_number
+        self.view = view
+        self.base_update_interval = update_interval
+        self.timeout = timeout
+        self.failures = 0
+
+    @property
+    def meter(self):
+        """Return the meter polled by this coordinator."""
+        return self.api.meters[self.electric_number]
+
+    def _backoff(self):
+        self.failures += 1
+        self.update_interval = min(
+            self.base_update_interval * (2 ** min(self.failures, MAX_BACKOFF_EXPONENT)),
+            max(MAX_UPDATE_INTERVAL, self.base_update_interval),
+        )
+        _LOGGER.debug(f"Meter {self.electric_number} {self.tier} failed {self.failures} time(s), next poll in {self.update_interval}.")
+
+    async def _async_refresh_meter(self):
+        """Refresh the meter's data of this tier, returning the meter's error if it failed."""
+        errors = await self.api.async_refresh_status(
+            electric_number=self.electric_number,
+            timeout=self.timeout,
+            **self.refresh_kwargs,
+        )
+        return errors.get(self.electric_number)
+
+    def _process_data(self):
+        """Post-process data after a successful refresh and return the coordinator data."""
+
+    def _next_interval(self):
+        """Return the delay until the next poll after a successful refresh."""
+        return self.base_update_interval
+
+    async def _async_update_data(self):
+        """Fetch data of the meter from API endpoint."""
+        try:
+            with self.api.metrics.trace(self.electric_number, self.tier) as trace:
+                return await self._async_fetch_data(trace)
+        finally:
+            async_dispatcher_send(self.hass, SIGNAL_UPDATE.format(self.electric_number, DATA_METRICS))
+
+    async def _async_fetch_data(self, trace):
+        try:
+            # The timeout only applies to the meter's requests, not to the wait
+            # for the concurrency limit, see `async_refresh_status`.
+            error = await self._async_refresh_meter()
+        except Exception as err:
+            _LOGGER.error(err)
+            trace.error = repr(err)
+            trace.timeout = isinstance(err, asyncio.TimeoutError)
+            self._backoff()
+            raise
+
+        if error is not None:
+            trace.error = repr(error)
+            trace.timeout = isinstance(error, asyncio.TimeoutError)
+            self._backoff()
+            raise UpdateFailed(f"Failed to refresh meter {self.electric_number} {self.tier}: {error!r}")
+
+        if trace.stale_since is not None:
+            _LOGGER.warning(f"Meter {self.electric_number} {self.tier} is throttled, serving data fetched at {dt_util.utc_from_timestamp(trace.stale_since)}.")
+        self.failures = 0
+        start = time.perf_counter()
+        data = self._process_data()
+        trace.process_seconds = time.perf_counter() - start
+        self.update_interval = self._next_interval()
+        return data
+
+
+class TaipowerAMICoordinator(TaipowerCoordinator):
+    """Frequent, lightweight AMI refresh feeding the kWh sensors.
+
+    Only the AMI records from the newest known `end_time` on are requested and
+    merged into the meter's `AMIHistory`. The coordinator data is the history
+    version, so a refresh that brings nothing new does not notify entities.
+    The next poll is aimed at the meter's next AMI publication. New records
+    are imported into long-term statistics in the background.
+    """
+
+    tier = "ami"
+
+    def __init__(self, hass, api, cache, electric_number, view, statistics=None, update_interval=DATA_UPDATE_INTERVAL):
+        super().__init__(hass, api, cache, electric_number, view, update_interval, api.meter_timeout, always_update=False)
+        self.scheduler = AMIPollScheduler(api.ami_period, update_interval)
+        self.statistics = statistics
+        self._history = None
+        self._fetched = None
+
+    def async_import_statistics(self):
+        """Schedule importing new AMI records into long-term statistics."""
+        if self.statistics is not None and isinstance(self.meter.ami, AMIHistory):
+            self.hass.async_create_task(
+                self.statistics.async_import(self.electric_number, self.meter.ami)
+            )
+
+    async def _async_update_data(self):
+        if not isinstance(self.meter.ami, AMIHistory):
+            self.meter.ami = AMIHistory(self.meter.ami)
+        self._history = self.meter.ami
+        self._fetched = None
+        return await super()._async_update_data()
+
+    async def _async_refresh_meter(self):
+        # Fetched records are only merged into the history once complete, so
+        # `meter.ami` always holds the whole history.
+        try:
+            self._fetched = await self.api.async_fetch_ami_since(
+                self.electric_number, self._history.last_end, self.timeout
+            )
+        except Exception as err:
+            return err
+        return None
+
+    def _process_data(self):
+        changed = self.cache.merge_ami(
+            self.electric_number, self.api.ami_period, self._history, self._fetched
+        )
+        self._fetched = None
+        self.view.update_ami(self._history)
+        _LOGGER.debug(f"Meter {self.electric_number} AMI changed: {changed}")
+        if changed:
+            self.async_import_statistics()
+        return self._history.version
+
+    def _next_interval(self):
+        return self.scheduler.next_interval(self._history.last_end, dt_util.utcnow())
+
+
+class TaipowerBillCoordinator(TaipowerCoordinator):
+    """Infrequent AMI unbilled and bill records refresh.
+
+    Polls every `BILL_UPDATE_INTERVAL`, or just after the next meter reading
+    date when that comes sooner. The coordinator data is a version bumped
+    when the unbilled data or bill records changed, so a refresh that brings
+    nothing new does not notify entities.
+    """
+
+    tier = "bill"
+    refresh_kwargs = {
+        "refresh_ami": False,
+        "refresh_ami_bill": False,
+        "refresh_ami_unbilled": True,
+        "refresh_bill_records": True,
+    }
+
+    def __init__(self, hass, api, cache, electric_number, view, update_interval=BILL_UPDATE_INTERVAL):
+        super().__init__(hass, api, cache, electric_number, view, update_interval, BILL_TIMEOUT, always_update=False)
+        self.update_interval = self._next_interval()
+        self.version = 0
+
+    def _process_data(self):
+        # The view follows the meter even when the cache is unchanged, as it
+        # may lag behind the cache, see `async_update_view`.
+        self.view.update_unbilled(self.meter.ami_unbilled)
+        self.view.update_bill(self.meter.bill_records)
+        if not self.cache.update_bill(self.meter):
+            _LOGGER.debug(f"Meter {self.electric_number} bill unchanged.")
+            return self.version
+        self.version += 1
+        # Billing period rollups and the unbilled charge next to the estimate
+        # are shown by the AMI entities, those left unchanged are not written.
+        async_dispatcher_send(self.hass, SIGNAL_UPDATE.format(self.electric_number, DATA_AMI))
+        return self.version
+
+    def async_update_view(self):
+        """Show the meter's unbilled data and bill records if the view lags behind.
+
+        Such as for an uncached meter whose first fetch partly failed, which
+        leaves data in the meter and the cache that no refresh reports as new.
+        """
+        if self.view.shows_bill(self.meter):
+            return
+        self.view.update_unbilled(self.meter.ami_unbilled)
+        self.view.update_bill(self.meter.bill_records)
+        for data_domain in (DATA_AMI, DATA_UNBILLED, DATA_BILL):
+            async_dispatcher_send(self.hass, SIGNAL_UPDATE.format(self.electric_number, data_domain))
+
+    def outdated(self):
+        """Return whether the meter's unbilled data and bill records are missing or older than the update interval."""
+        if self.meter.ami_unbilled is None or self.meter.bill_records is None:
+            return True
+        fetched_at = self.cache.bill_fetched_at(self.electric_number)
+        return fetched_at is None or time.time() - fetched_at >= self.base_update_interval.total_seconds()
+
+    def _next_interval(self):
+        unbilled = self.meter.ami_unbilled
+        if unbilled is None:
+            return self.base_update_interval
+
+        next_reading = datetime.datetime.combine(
+            parse_date(unbilled.next_reading_date),
+            datetime.time(tzinfo=dt_util.get_time_zone(TAIPOWER_TIME_ZONE)),
+        ) + BILL_PUBLICATION_DELAY
+        until_reading = next_reading - dt_util.utcnow()
+        if timedelta(0) < until_reading < self.base_update_interval:
+            return until_reading
+        return self.base_update_interval
+
+
+def create_coordinators(hass, api, cache, tariff=TARIFF_TIERED):
+    """Create AMI and bill coordinators per meter, sharing the meter's view.
+
+    Views start from whatever the meters hold, e.g. data restored from the
+    cache, so entities have states before the first refresh.
+    """
+    statistics = TaipowerStatistics(hass, api.ami_period)
+    views = {
+        number: TaipowerMeterView(number, tariff, api.metrics, api.max_retries)
+        for number in api.meters
+    }
+    for number, view in views.items():
+        view.update(api.meters[number])
+    ami_coordinators = {
+        number: TaipowerAMICoordinator(hass, api, cache, number, views[number], statistics)
+        for number in api.meters
+    }
+    bill_coordinators = {
+        number: TaipowerBillCoordinator(hass, api, cache, number, views[number])
+        for number in api.meters
+    }
+    return ami_coordinators, bill_coordinators
+
+
+async def async_start_coordinators(hass, ami_coordinators, bill_coordinators, fetched=()):
+    """Run the first refreshes of coordinators made by `create_coordinators`.
+
+    AMI coordinators of meters restored from the cache run their first
+    refreshes concurrently to fetch the newest periods, while those in
+    `fetched` are already current. Bill coordinators start from cached or
+    fetched data and only refresh now if neither is available or the cached
+    data are older than their update interval. Afterwards the
+    AMI history of every meter is brought up to date in long-term statistics.
+    """
+    for number in fetched:
+        coordinator = ami_coordinators[number]
+        coordinator.update_interval = coordinator.scheduler.next_interval(coordinator.meter.ami.last_end, dt_util.utcnow())
+    await asyncio.gather(
+        *[
+            coordinator.async_refresh() for number, coordinator in ami_coordinators.items()
+            if number not in fetched
+        ],
+        *[
+            coordinator.async_refresh() for coordinator in bill_coordinators.values()
+            if coordinator.outdated()
+        ],
+    )
+    for number in fetched:
+        coordinator = ami_coordinators[number]
+        coordinator.view.update(coordinator.meter)
+        for data_domain in (DATA_AMI, DATA_UNBILLED, DATA_BILL):
+            async_dispatcher_send(hass, SIGNAL_UPDATE.format(number, data_domain))
+    for coordinator in bill_coordinators.values():
+        coordinator.async_update_view()
+    for coordinator in ami_coordinators.values():
+        coordinator.async_import_statistics()
+
@@ -0,0 +1,39 @@
+"""Taipower integration."""
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import (API, BILL_COORDINATOR, CONF_ACCOUNT, CONF_METERS,
+                    CONF_PASSWORD, CONF_TOKENS, COORDINATOR, DOMAIN)
+
+TO_REDACT = {CONF_ACCOUNT, CONF_METERS, CONF_PASSWORD, CONF_TOKENS}
+
+
+def _coordinator_diagnostics(coordinator):
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": str(coordinator.update_interval),
+        "failures": coordinator.failures,
+    }
+
+
+async def async_get_config_entry_diagnostics(hass, config_entry):
+    """Return the refresh metrics and coordinator state of every meter of the account."""
+    data = hass.data[DOMAIN][config_entry.entry_id]
+    api = data[API]
+    ami_coordinators = data[COORDINATOR] or {}
+    bill_coordinators = data[BILL_COORDINATOR] or {}
+    return {
+        "config_entry": async_redact_data(config_entry.as_dict(), TO_REDACT),
+        "ami_period": api.ami_period,
+        "max_retries": api.max_retries,
+        "max_concurrency": api.max_concurrency,
+        "meter_timeout": api.meter_timeout,
+        "metrics": api.metrics.as_dict(),
+        "broker": api.broker.as_dict() if hasattr(api, "broker") else None,
+        "coordinators": {
+            number: {
+                "ami": _coordinator_diagnostics(ami_coordinators[number]),
+                "bill": _coordinator_diagnostics(bill_coordinators[number]),
+            }
+            for number in ami_coordinators
+        },
+    }
@@ -0,0 +1,92 @@
+"""Taipower integration."""
+import bisect
+from collections.abc import Mapping
+
+AGGREGATED_COLUMNS = ("offpeak_kwh", "halfpeak_kwh", "satpeak_kwh", "peak_kwh", "total_kwh")
+
+
+class AMIHistory(Mapping):
+    """Time-ordered AMI records of a meter, keyed by `start_time`.
+
+    Behaves like the `meter.ami` dict returned by the API, but records are
+    merged in place: finalized entries keep their objects and only records
+    whose payload changed are replaced. `version` is bumped on every change.
+    """
+
+    def __init__(self, records=None):
+        self._records = {}
+        self._keys = []
+        self.version = 0
+        self.last_end = None
+        if records:
+            self.merge(records)
+
+    def __getitem__(self, key):
+        return self._records[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        """Return `start_time` keys in chronological order."""
+        return list(self._keys)
+
+    def keys_since(self, start_time):
+        """Return keys from `start_time` on, in chronological order."""
+        return self._keys[bisect.bisect_left(self._keys, start_time):]
+
+    def keys_between(self, start_time, end_time):
+        """Return keys from `start_time` up to, excluding, `end_time`."""
+        return self._keys[
+            bisect.bisect_left(self._keys, start_time):bisect.bisect_left(self._keys, end_time)
+        ]
+
+    def aggregate(self, keys):
+        """Sum the kWh columns of the records of `keys`, skipping missing data."""
+        totals = dict.fromkeys(AGGREGATED_COLUMNS, 0.0)
+        count = 0
+        for key in keys:
+            record = self._records[key]
+            if record.is_missing_data:
+                continue
+            count += 1
+            for column in AGGREGATED_COLUMNS:
+                value = getattr(record, column)
+                if value is not None:
+                    totals[column] += float(value)
+        return {"count": count, **totals}
+
+    def merge(self, records):
+        """Merge AMI records, returning the keys that were added or changed."""
+        changed = []
+        for key, record in records.items():
+            current = self._records.get(key)
+            if current is not None and current._json == record._json:
+                continue
+            if current is None:
+                if not self._keys or key > self._keys[-1]:
+                    self._keys.append(key)
+                else:
+                    bisect.insort(self._keys, key)
+            self._records[key] = record
+            changed.append(key)
+            if not record.is_missing_data and (self.last_end is None or record.end_time > self.last_end):
+                self.last_end = record.end_time
+
+        if changed:
+            self.version += 1
+        return changed
+
+    def trim(self, size):
+        """Drop the oldest records beyond `size`, returning their keys."""
+        if len(self._keys) <= size:
+            return []
+        removed = self._keys[:len(self._keys) - size]
+        del self._keys[:len(removed)]
+        for key in removed:
+            del self._records[key]
+        self.version += 1
+        return removed
@@ -0,0 +1,150 @@
+"""Taipower integration."""
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Trace of the refresh running in the current task, shared by the requests it makes.
+_CURRENT_TRACE = contextvars.ContextVar("taipower_refresh_trace", default=None)
+
+
+class RefreshTrace:
+    """Measurements of a single refresh of a meter's tier."""
+
+    __slots__ = (
+        "tier", "started", "seconds", "requests", "payload_bytes",
+        "parse_seconds", "process_seconds", "retries", "timeout", "error",
+        "stale_since",
+    )
+
+    def __init__(self, tier):
+        self.tier = tier
+        self.started = time.time()
+        self.seconds = None
+        self.requests = 0
+        self.payload_bytes = 0
+        self.parse_seconds = 0.0
+        self.process_seconds = 0.0
+        self.retries = 0
+        self.timeout = False
+        self.error = None
+        # When the oldest response served from the broker's last good data was fetched.
+        self.stale_since = None
+
+    def as_dict(self):
+        return {
+            "started": self.started,
+            "seconds": self.seconds,
+            "requests": self.requests,
+            "payload_bytes": self.payload_bytes,
+            "parse_seconds": self.parse_seconds,
+            "process_seconds": self.process_seconds,
+            "retries": self.retries,
+            "timeout": self.timeout,
+            "error": self.error,
+            "stale_since": self.stale_since,
+        }
+
+
+class MeterMetrics:
+    """Latest refresh traces per tier and cumulative counters of a meter."""
+
+    def __init__(self):
+        self.last = None
+        self.tiers = {}
+        self.refreshes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def record(self, trace):
+        self.last = trace
+        self.tiers[trace.tier] = trace
+        self.refreshes += 1
+        self.retries += trace.retries
+        if trace.error is not None:
+            self.failures += 1
+        if trace.timeout:
+            self.timeouts += 1
+
+    def as_dict(self):
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "tiers": {tier: trace.as_dict() for tier, trace in self.tiers.items()},
+        }
+
+
+class TaipowerMetrics:
+    """Refresh instrumentation of an account.
+
+    A refresh run inside `trace` collects the latency, payload size, JSON
+    parse time and retries of every request it makes, including those of
+    concurrent tasks it spawns, then adds them to the meter's metrics.
+    """
+
+    def __init__(self):
+        self.logins = 0
+        self.login_seconds = None
+        self.meters = {}
+
+    def meter(self, electric_number):
+        """Return the metrics of a meter."""
+        if electric_number not in self.meters:
+            self.meters[electric_number] = MeterMetrics()
+        return self.meters[electric_number]
+
+    @contextmanager
+    def trace(self, electric_number, tier):
+        """Trace a refresh of a meter's tier, recording it when done."""
+        trace = RefreshTrace(tier)
+        token = _CURRENT_TRACE.set(trace)
+        start = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.seconds = time.perf_counter() - start
+            _CURRENT_TRACE.reset(token)
+            self.meter(electric_number).record(trace)
+
+    def record_login(self, seconds):
+        """Record the duration of a token request."""
+        self.logins += 1
+        self.login_seconds = seconds
+
+    def record_cache(self, electric_number, hit):
+        """Record whether a meter was restored from the cache at startup."""
+        metrics = self.meter(electric_number)
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+    def as_dict(self):
+        return {
+            "logins": self.logins,
+            "login_seconds": self.login_seconds,
+            "meters": {number: metrics.as_dict() for number, metrics in self.meters.items()},
+        }
+
+
+def record_request(payload_bytes, parse_seconds, retries):
+    """Add a request's measurements to the refresh being traced, if any."""
+    trace = _CURRENT_TRACE.get()
+    if trace is not None:
+        trace.requests += 1
+        trace.payload_bytes += payload_bytes
+        trace.parse_seconds += parse_seconds
+        trace.retries += retries
+
+
+def record_stale(fetched_at):
+    """Mark the refresh being traced, if any, as served stale data fetched at `fetched_at`."""
+    trace = _CURRENT_TRACE.get()
+    if trace is not None and (trace.stale_since is None or fetched_at < trace.stale_since):
+        trace.stale_since = fetched_at
@@ -3,7 +3,8 @@ import logging
 
 from homeassistant.components.number import NumberEntity
 
-from . import AMI_KEY, API, COORDINATOR, DOMAIN, MONTH_KEY, TaipowerEntity
+from . import (API, BILL_COORDINATOR, COORDINATOR, DATA_AMI, DATA_BILL,
+               DOMAIN, YAML_DATA, TaipowerEntity)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -11,14 +12,18 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
     """Set up the number platform."""
     
-    api = hass.data[DOMAIN][API]
-    coordinator = hass.data[DOMAIN][COORDINATOR]
+    data = hass.data[DOMAIN][YAML_DATA]
+    api = data[API]
+    coordinators = data[COORDINATOR]
+    bill_coordinators = data[BILL_COORDINATOR]
 
     for meter in api.meters.values():
+        coordinator = coordinators[meter.number]
+        bill_coordinator = bill_coordinators[meter.number]
         async_add_entities(
             [
                 TaipowerAMISelectorNumberEntity(meter, coordinator),
-                TaipowerBillMonthSelectorNumberEntity(meter, coordinator)
+                TaipowerBillMonthSelectorNumberEntity(meter, bill_coordinator)
             ],
         )
 
@@ -26,19 +31,25 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
 async def async_setup_entry(hass, config_entry, async_add_devices):
     """Set up the number platform from a config entry."""
 
-    api = hass.data[DOMAIN][API]
-    coordinator = hass.data[DOMAIN][COORDINATOR]
+    data = hass.data[DOMAIN][config_entry.entry_id]
+    api = data[API]
+    coordinators = data[COORDINATOR]
+    bill_coordinators = data[BILL_COORDINATOR]
 
     for meter in api.meters.values():
+        coordinator = coordinators[meter.number]
+        bill_coordinator = bill_coordinators[meter.number]
         async_add_devices(
             [
                 TaipowerAMISelectorNumberEntity(meter, coordinator),
-                TaipowerBillMonthSelectorNumberEntity(meter, coordinator)
+                TaipowerBillMonthSelectorNumberEntity(meter, bill_coordinator)
             ],
         )
 
 
 class TaipowerBillMonthSelectorNumberEntity(TaipowerEntity, NumberEntity):
+    data_domain = DATA_BILL
+
     def __init__(self, meter, coordinator):
         super().__init__(meter, coordinator)
         self._value = 0
@@ -51,7 +62,7 @@ class TaipowerBillMonthSelectorNumberEntity(TaipowerEntity, NumberEntity):
     @property
     def value(self):
         """Return the value of the entity."""
-        return self._value
+        return self._view.bill_index.positions.get(self._view.month_key, self._value)
 
     @property
     def min_value(self):
@@ -61,22 +72,29 @@ class TaipowerBillMonthSelectorNumberEntity(TaipowerEntity, NumberEntity):
     @property
     def max_value(self):
         """Return the maximum month."""
-        return len(self._meter.bill_records) - 1 if self._meter.bill_records is not None else 0
+        return max(len(self._view.bill_index) - 1, 0)
 
     @property
     def unique_id(self):
         return f"{self._meter.number}_bill_month_selector_number"
 
-    def set_value(self, value):
+    def _shown_state(self):
+        return self.value, self.max_value
+
+    async def async_set_value(self, value):
         """Set new month."""
+        # On the event loop, as the coordinators update the same view.
         value = int(value)
         _LOGGER.debug(f"Set {self.name} value to {value}")
         self._value = value
-        self.hass.data[DOMAIN][MONTH_KEY] = list(self._meter.bill_records.keys())[value]
-        self.update()
+        self._view.month_key = self._view.bill_index.keys[value]
+        self._view.update_bill(self._meter.bill_records)
+        self.async_update_domain()
 
 
 class TaipowerAMISelectorNumberEntity(TaipowerEntity, NumberEntity):
+    data_domain = DATA_AMI
+
     def __init__(self, meter, coordinator):
         super().__init__(meter, coordinator)
         self._value = 0
@@ -89,7 +107,7 @@ class TaipowerAMISelectorNumberEntity(TaipowerEntity, NumberEntity):
     @property
     def value(self):
         """Return the value of the entity."""
-        return self._value
+        return self._view.ami_index.positions.get(self._view.ami_key, self._value)
 
     @property
     def min_value(self):
@@ -99,19 +117,24 @@ class TaipowerAMISelectorNumberEntity(TaipowerEntity, NumberEntity):
     @property
     def max_value(self):
         """Return the maximum value."""
-        return len(self._meter.ami) - 1 if self._meter.ami is not None else 0
+        return max(len(self._view.ami_index) - 1, 0)
 
     @property
     def unique_id(self):
         return f"{self._meter.number}_ami_selector_number"
 
-    def set_value(self, value):
+    def _shown_state(self):
+        return self.value, self.max_value
+
+    async def async_set_value(self, value):
         """Set new value."""
+        # On the event loop, as the coordinators update the same view.
         self._value = int(value)
         
         if self._meter.ami is not None:
             _LOGGER.debug(f"Set {self.name} value to {self._value}")
-            self.hass.data[DOMAIN][AMI_KEY] = list(self._meter.ami.keys())[self._value]
-            self.update()
+            self._view.ami_key = self._view.ami_index.keys[self._value]
+            self._view.update_ami(self._meter.ami)
+            self.async_update_domain()
         else:
             _LOGGER.debug(f"{self.name} no AMI can be selected.")
\ No newline at end of file
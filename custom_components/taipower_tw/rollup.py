@@ -0,0 +1,70 @@
+"""Taipower integration."""
+import datetime
+
+import numpy as np
+
+from .history import AGGREGATED_COLUMNS
+
+
+class AMIColumns:
+    """Columnar copy of an AMI history for bulk aggregation.
+
+    `local` holds the Taipei wall-clock start of each record, `values` one
+    row per record and one column per `AGGREGATED_COLUMNS` entry, with
+    records missing data and absent columns as NaN.
+    """
+
+    __slots__ = ("local", "values")
+
+    def __init__(self, history):
+        keys = history.keys()
+        self.local = np.array(
+            [f"{key[0:4]}-{key[4:6]}-{key[6:8]}T{key[8:10]}:{key[10:12]}:{key[12:14]}" for key in keys],
+            dtype="datetime64[s]",
+        )
+        self.values = np.array(
+            [
+                [None if record.is_missing_data else getattr(record, column) for column in AGGREGATED_COLUMNS]
+                for record in (history[key] for key in keys)
+            ],
+            dtype=float,
+        ).reshape(len(keys), len(AGGREGATED_COLUMNS))
+
+    def __len__(self):
+        return len(self.local)
+
+    def days(self):
+        """Return the Taipei date of each record."""
+        return self.local.astype("datetime64[D]")
+
+    def weeks(self):
+        """Return the Monday starting the week of each record."""
+        days = self.days()
+        # Day 0 of datetime64 is a Thursday.
+        return days - (days.astype(np.int64) + 3) % 7
+
+    def rollup(self, labels, since=None):
+        """Sum the columns per distinct label, records being in label order.
+
+        Returns the labels and an array with a row of sums per label. Only
+        records on or after the `since` date are included.
+        """
+        values = self.values
+        if since is not None:
+            mask = self.local >= np.datetime64(since, "s")
+            labels = labels[mask]
+            values = values[mask]
+        if not len(labels):
+            return labels, np.zeros((0, len(AGGREGATED_COLUMNS)))
+        groups, starts = np.unique(labels, return_index=True)
+        return groups, np.add.reduceat(np.nan_to_num(values), starts, axis=0)
+
+
+def to_date(value):
+    """Convert a numpy date to a `datetime.date`."""
+    return value.astype("datetime64[D]").astype(datetime.date)
+
+
+def to_kwh(row):
+    """Map a row of sums to its column names."""
+    return {column: round(float(value), 3) for column, value in zip(AGGREGATED_COLUMNS, row)}
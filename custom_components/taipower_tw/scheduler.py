@@ -0,0 +1,72 @@
+"""Taipower integration."""
+import logging
+from datetime import timedelta
+
+from .util import add_months, parse_ami_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+AMI_PERIOD_LENGTH = {
+    "quater": timedelta(minutes=15),
+    "hour": timedelta(hours=1),
+    "daily": timedelta(days=1),
+}
+# How long Taipower usually takes to publish a period after it ends.
+PUBLICATION_DELAY = {
+    "quater": timedelta(minutes=10),
+    "hour": timedelta(minutes=15),
+    "daily": timedelta(hours=2),
+    "monthly": timedelta(hours=6),
+}
+# First retry once a period is overdue; doubled on every poll that brings nothing new.
+OVERDUE_INTERVAL = {
+    "quater": timedelta(minutes=5),
+    "hour": timedelta(minutes=10),
+    "daily": timedelta(minutes=30),
+    "monthly": timedelta(hours=2),
+}
+MAX_INTERVAL = {
+    "quater": timedelta(hours=1),
+    "hour": timedelta(hours=2),
+    "daily": timedelta(hours=6),
+    "monthly": timedelta(hours=24),
+}
+MIN_INTERVAL = timedelta(minutes=1)
+
+
+class AMIPollScheduler:
+    """Derives the next poll from the AMI period and the newest published `end_time`.
+
+    Polls are aimed just after the next expected publication. When that moment
+    has passed without new data, polling backs off exponentially.
+    """
+
+    def __init__(self, ami_period, default_interval):
+        self.ami_period = ami_period
+        self.default_interval = default_interval
+        self.overdue_polls = 0
+
+    def _next_end(self, end):
+        if self.ami_period == "monthly":
+            return add_months(end, 1)
+        return end + AMI_PERIOD_LENGTH[self.ami_period]
+
+    def next_interval(self, last_end, now):
+        """Return the delay until the next poll given the newest recorded `end_time`."""
+        if last_end is None:
+            return self.default_interval
+
+        latest = parse_ami_datetime(last_end)
+        expected = self._next_end(latest) + PUBLICATION_DELAY[self.ami_period]
+        if expected > now:
+            self.overdue_polls = 0
+            interval = expected - now
+        else:
+            interval = OVERDUE_INTERVAL[self.ami_period] * (2 ** self.overdue_polls)
+            # Stop doubling once capped, the interval would overflow eventually.
+            if interval < MAX_INTERVAL[self.ami_period]:
+                self.overdue_polls += 1
+
+        interval = max(MIN_INTERVAL, min(interval, MAX_INTERVAL[self.ami_period]))
+        _LOGGER.debug(f"Newest AMI ends at {latest}, next publication expected at {expected}, polling in {interval}.")
+        return interval
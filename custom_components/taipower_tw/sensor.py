@@ -1,743 +1,426 @@
 """Taipower integration."""
-import datetime
 import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
 
-from homeassistant.components.sensor import (STATE_CLASS_MEASUREMENT,
-                                             SensorEntity)
-from homeassistant.const import (DEVICE_CLASS_DATE, DEVICE_CLASS_ENERGY,
-                                 DEVICE_CLASS_MONETARY, ENERGY_KILO_WATT_HOUR)
+from homeassistant.components.sensor import (SensorDeviceClass, SensorEntity,
+                                             SensorEntityDescription,
+                                             SensorStateClass)
+from homeassistant.const import (EntityCategory, UnitOfEnergy,
+                                 UnitOfInformation, UnitOfTime)
+from homeassistant.util import dt as dt_util
 
-from . import AMI_KEY, API, COORDINATOR, DOMAIN, MONTH_KEY, TaipowerEntity
+from . import (API, BILL_COORDINATOR, COORDINATOR, DATA_AMI, DATA_BILL,
+               DATA_METRICS, DATA_UNBILLED, DOMAIN, YAML_DATA,
+               TaipowerEntity)
 
 _LOGGER = logging.getLogger(__name__)
+# Data domains refreshed by the bill coordinator, the others by the AMI coordinator.
+BILL_DATA_DOMAINS = (DATA_UNBILLED, DATA_BILL)
 
 
-async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
-    """Set up the sensor platform."""
-    
-    api = hass.data[DOMAIN][API]
-    coordinator = hass.data[DOMAIN][COORDINATOR]
-
-    for meter in api.meters.values():
-        if meter.type == "AMI":
-            async_add_entities(
-                [
-                    TaipowerAMIOffPeakKwhSensorEntity(meter, coordinator),
-                    TaipowerAMIHalfPeakKwhSensorEntity(meter, coordinator),
-                    TaipowerAMISatPeakKwhSensorEntity(meter, coordinator),
-                    TaipowerAMIPeakKwhSensorEntity(meter, coordinator),
-                    TaipowerAMITotalKwhSensorEntity(meter, coordinator),
-                    TaipowerAMIStartTimeIndicatorSensorEntity(meter, coordinator),
-                    TaipowerAMIEndTimeIndicatorSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledChargeSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledDeadlineSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledKwhSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledReadingDateSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledLastReadingDateSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledNextReadingDateSensorEntity(meter, coordinator),
-                    TaipowerBillChargePeriodSensorEntity(meter, coordinator),
-                    TaipowerBillChargeSensorEntity(meter, coordinator),
-                    TaipowerBillFormulaSensorEntity(meter, coordinator),
-                    TaipowerBillKwhSensorEntity(meter, coordinator),
-                    TaipowerBillMonthIndicatorSensorEntity(meter, coordinator),
-                ],
-            )
+@dataclass(frozen=True, kw_only=True)
+class TaipowerSensorEntityDescription(SensorEntityDescription):
+    """Describes a Taipower sensor by functions of the meter's view.
 
+    The entity is named after its meter followed by `name`, and its unique id
+    is `<electric number>_<key>_sensor`.
+    """
 
-async def async_setup_entry(hass, config_entry, async_add_devices):
-    """Set up the sensor platform from a config entry."""
+    data_domain: str
+    value_fn: Callable[[Any], Any]
+    attributes_fn: Optional[Callable[[Any], Optional[dict]]] = None
+    available_fn: Optional[Callable[[Any], bool]] = None
 
-    api = hass.data[DOMAIN][API]
-    coordinator = hass.data[DOMAIN][COORDINATOR]
-
-    for meter in api.meters.values():
-        if meter.type == "AMI":
-            async_add_devices(
-                [
-                    TaipowerAMIOffPeakKwhSensorEntity(meter, coordinator),
-                    TaipowerAMIHalfPeakKwhSensorEntity(meter, coordinator),
-                    TaipowerAMISatPeakKwhSensorEntity(meter, coordinator),
-                    TaipowerAMIPeakKwhSensorEntity(meter, coordinator),
-                    TaipowerAMITotalKwhSensorEntity(meter, coordinator),
-                    TaipowerAMIStartTimeIndicatorSensorEntity(meter, coordinator),
-                    TaipowerAMIEndTimeIndicatorSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledChargeSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledDeadlineSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledKwhSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledReadingDateSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledLastReadingDateSensorEntity(meter, coordinator),
-                    TaipowerAMIUnbilledNextReadingDateSensorEntity(meter, coordinator),
-                    TaipowerBillChargePeriodSensorEntity(meter, coordinator),
-                    TaipowerBillChargeSensorEntity(meter, coordinator),
-                    TaipowerBillFormulaSensorEntity(meter, coordinator),
-                    TaipowerBillKwhSensorEntity(meter, coordinator),
-                    TaipowerBillMonthIndicatorSensorEntity(meter, coordinator),
-                ],
-            )
 
+def _read(snapshot, attribute, format=None):
+    """Return a value function reading `attribute` of a snapshot of the view, formatted with `format`."""
+    def value_fn(view):
+        source = getattr(view, snapshot)
+        value = getattr(source, attribute) if source is not None else None
+        if format is not None and value is not None:
+            return value.strftime(format)
+        return value
+    return value_fn
 
-class TaipowerAMIOffPeakKwhSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-    
-    @property
-    def available(self) -> bool:
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami and self._meter.ami[ami_key].is_missing_data:
-            return False
-        return True
 
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Off-peak Kw/h"
+def _rollup_total(attribute):
+    """Return a value function reading the total kWh of a rollup."""
+    def value_fn(view):
+        kwh = getattr(view.rollups, attribute) if view.rollups is not None else None
+        return kwh["total_kwh"] if kwh is not None else None
+    return value_fn
 
-    @property
-    def state(self):
-        """Return the ami off-peak KW/H."""
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami:
-            return self._meter.ami[ami_key].offpeak_kwh
-        return None
 
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_ENERGY
+def _last_refresh(attribute, digits=None):
+    """Return a value function reading `attribute` of the meter's latest refresh, rounded to `digits`."""
+    def value_fn(view):
+        if view.metrics is None or view.metrics.last is None:
+            return None
+        value = getattr(view.metrics.last, attribute)
+        return round(value, digits) if digits is not None else value
+    return value_fn
 
-    @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement."""
-        return ENERGY_KILO_WATT_HOUR
 
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_offpeak_kwh_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
+def _per_tier(metrics, attribute):
+    return {f"{tier}_{attribute}": getattr(trace, attribute) for tier, trace in metrics.tiers.items()}
 
 
-class TaipowerAMIHalfPeakKwhSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-    
-    @property
-    def available(self) -> bool:
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami and self._meter.ami[ami_key].is_missing_data:
-            return False
-        return True
+def _ami_available(view):
+    return view.ami is None or not view.ami.is_missing_data
 
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Half-peak Kw/h"
 
-    @property
-    def state(self):
-        """Return the ami half-peak KW/H."""
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami:
-            return self._meter.ami[ami_key].halfpeak_kwh
+def _day_attributes(view):
+    """Return the latest day and its KW/H per time-of-use column."""
+    if view.rollups is None or view.rollups.day_kwh is None:
         return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_ENERGY
-
-    @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement."""
-        return ENERGY_KILO_WATT_HOUR
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_halfpeak_kwh_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
+    return {"date": view.rollups.day.isoformat(), **view.rollups.day_kwh}
 
 
-class TaipowerAMISatPeakKwhSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-    
-    @property
-    def available(self) -> bool:
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami and self._meter.ami[ami_key].is_missing_data:
-            return False
-        return True
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Saturday Half-peak Kw/h"
-
-    @property
-    def state(self):
-        """Return the ami saturday half-peak KW/H."""
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami:
-            return self._meter.ami[ami_key].satpeak_kwh
+def _week_attributes(view):
+    """Return the latest week and its KW/H per time-of-use column."""
+    if view.rollups is None or view.rollups.week_kwh is None:
         return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_ENERGY
-
-    @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement."""
-        return ENERGY_KILO_WATT_HOUR
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_satpeak_kwh_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
+    return {"week_start": view.rollups.week.isoformat(), **view.rollups.week_kwh}
 
 
-class TaipowerAMIPeakKwhSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-    
-    @property
-    def available(self) -> bool:
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami and self._meter.ami[ami_key].is_missing_data:
-            return False
-        return True
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Peak Kw/h"
-
-    @property
-    def state(self):
-        """Return the ami peak KW/H."""
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami:
-            return self._meter.ami[ami_key].peak_kwh
+def _billing_period_attributes(view):
+    """Return the current billing period and its KW/H per time-of-use column."""
+    if view.rollups is None or view.rollups.billing_kwh is None:
         return None
+    return {"start": view.rollups.billing_start.isoformat(), "days": view.rollups.billing_days, **view.rollups.billing_kwh}
 
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_ENERGY
 
-    @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement."""
-        return ENERGY_KILO_WATT_HOUR
+def _estimated_charge(view):
+    return round(view.estimate) if view.estimate is not None else None
 
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_peak_kwh_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
-
-
-class TaipowerAMITotalKwhSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
 
-    @property
-    def available(self) -> bool:
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami and self._meter.ami[ami_key].is_missing_data:
-            return False
-        return True
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Total Kw/h"
-
-    @property
-    def state(self):
-        """Return the ami total KW/H."""
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami:
-            return self._meter.ami[ami_key].total_kwh
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_ENERGY
-
-    @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement."""
-        return ENERGY_KILO_WATT_HOUR
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_total_kwh_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
-
-
-class TaipowerAMIStartTimeIndicatorSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Start Time Indicator"
-
-    @property
-    def state(self):
-        """Return the date and time in yyyy-mm-dd-hh format."""
-        value = self.native_value
-        if value is not None:
-            return self.native_value.strftime("%Y-%m-%d-%H-%M-%S")
+def _estimated_charge_attributes(view):
+    """Return the tariff and the charge reported by Taipower to compare with."""
+    if view.estimate is None:
         return None
-        
-    @property
-    def native_value(self):
-        """Return the date and time in datetime.datetime object."""
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami:
-            start_time = self._meter.ami[ami_key].start_time
-            return datetime.datetime(int(start_time[0:4]), int(start_time[4:6]), int(start_time[6:8]), int(start_time[8:10]), int(start_time[10:12]), int(start_time[12:14]))
+    return {
+        "tariff": view.tariff,
+        "start": view.rollups.billing_start.isoformat(),
+        "end": view.rollups.day.isoformat(),
+        "kwh": view.rollups.billing_kwh["total_kwh"],
+        "unbilled_charge": view.unbilled.charge,
+    }
+
+
+def _latency_attributes(view):
+    """Return the refreshed tier, the latency of every tier and the latest login time."""
+    if view.metrics is None or view.metrics.last is None:
         return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_DATE
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_start_time_indicator_sensor"
-
-
-class TaipowerAMIEndTimeIndicatorSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI End Time Indicator"
-
-    @property
-    def state(self):
-        """Return the date and time in yyyy-mm-dd-hh format."""
-        value = self.native_value
-        if value is not None:
-            return self.native_value.strftime("%Y-%m-%d-%H-%M-%S")
-        return None
-        
-    @property
-    def native_value(self):
-        """Return the date and time in datetime.datetime object."""
-        ami_key = self.hass.data[DOMAIN][AMI_KEY]
-        if self._meter.ami is not None and ami_key in self._meter.ami:
-            end_time = self._meter.ami[ami_key].end_time
-            return datetime.datetime(int(end_time[0:4]), int(end_time[4:6]), int(end_time[6:8]), int(end_time[8:10]), int(end_time[10:12]), int(end_time[12:14]))
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_DATE
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_end_time_indicator_sensor"
-
-
-class TaipowerAMIUnbilledChargeSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Unbilled Charge"
-
-    @property
-    def state(self):
-        """Return the ami unbilled charge."""
-        if self._meter.ami_unbilled is not None:
-            return self._meter.ami_unbilled.charge
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_MONETARY
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_unbilled_charge_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
-
-
-class TaipowerAMIUnbilledKwhSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Unbilled Kw/h"
-
-    @property
-    def state(self):
-        """Return the ami unbilled kw/h."""
-        if self._meter.ami_unbilled is not None:
-            return self._meter.ami_unbilled.kwh
+    stale_since = view.metrics.last.stale_since
+    return {
+        "tier": view.metrics.last.tier,
+        "stale_since": dt_util.utc_from_timestamp(stale_since).isoformat() if stale_since else None,
+        **_per_tier(view.metrics, "seconds"),
+        "login_seconds": view.account_metrics.login_seconds,
+        "logins": view.account_metrics.logins,
+    }
+
+
+def _payload_size_attributes(view):
+    """Return the number of requests and the payload size of every tier."""
+    if view.metrics is None or view.metrics.last is None:
         return None
+    return {"requests": view.metrics.last.requests, **_per_tier(view.metrics, "payload_bytes")}
 
-    @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement."""
-        return ENERGY_KILO_WATT_HOUR
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_ENERGY
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_unbilled_kwh_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
-
-
-class TaipowerAMIUnbilledDeadlineSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Unbilled Deadline"
 
-    @property
-    def state(self):
-        """Return the date in yyyy-mm-dd format."""
-        value = self.native_value
-        if value is not None:
-            return self.native_value.strftime("%Y-%m-%d")
-        return None
-        
-    @property
-    def native_value(self):
-        """Return the date in datetime.date object."""
-        if self._meter.ami_unbilled is not None:
-            deadline = self._meter.ami_unbilled.deadline
-            return datetime.date(int(deadline[0:4]), int(deadline[4:6]), int(deadline[6:8]))
+def _parse_time_attributes(view):
+    """Return the seconds spent processing the refreshed data, per tier too."""
+    if view.metrics is None or view.metrics.last is None:
         return None
+    return {
+        "process_seconds": round(view.metrics.last.process_seconds, 6),
+        **_per_tier(view.metrics, "parse_seconds"),
+        **_per_tier(view.metrics, "process_seconds"),
+    }
 
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_DATE
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_unbilled_deadline_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
-
-
-class TaipowerAMIUnbilledReadingDateSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Unbilled Reading Date"
 
-    @property
-    def state(self):
-        """Return the date in yyyy-mm-dd format."""
-        value = self.native_value
-        if value is not None:
-            return self.native_value.strftime("%Y-%m-%d")
+def _retries_attributes(view):
+    """Return the configured retries per request and the retries so far."""
+    if view.metrics is None:
         return None
-        
-    @property
-    def native_value(self):
-        """Return the date in datetime.date object."""
-        if self._meter.ami_unbilled is not None:
-            reading_date = self._meter.ami_unbilled.reading_date
-            return datetime.date(int(reading_date[0:4]), int(reading_date[4:6]), int(reading_date[6:8]))
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_DATE
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_unbilled_reading_date_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
+    return {"max_retries": view.max_retries, "total_retries": view.metrics.retries}
 
 
-class TaipowerAMIUnbilledLastReadingDateSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
+def _timeouts(view):
+    return view.metrics.timeouts if view.metrics is not None else None
 
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Unbilled Last Reading Date"
 
-    @property
-    def state(self):
-        """Return the date in yyyy-mm-dd format."""
-        value = self.native_value
-        if value is not None:
-            return self.native_value.strftime("%Y-%m-%d")
+def _timeouts_attributes(view):
+    """Return the refresh, failure and startup cache counters."""
+    if view.metrics is None:
         return None
-        
-    @property
-    def native_value(self):
-        """Return the date in datetime.date object."""
-        if self._meter.ami_unbilled is not None:
-            last_reading_date = self._meter.ami_unbilled.last_reading_date
-            return datetime.date(int(last_reading_date[0:4]), int(last_reading_date[4:6]), int(last_reading_date[6:8]))
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_DATE
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_unbilled_last_reading_date_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
-
+    return {
+        "refreshes": view.metrics.refreshes,
+        "failures": view.metrics.failures,
+        "last_error": view.metrics.last.error if view.metrics.last is not None else None,
+        "cache_hits": view.metrics.cache_hits,
+        "cache_misses": view.metrics.cache_misses,
+    }
+
+
+def _ami_kwh(key, name, attribute):
+    return TaipowerSensorEntityDescription(
+        key=key,
+        name=name,
+        data_domain=DATA_AMI,
+        value_fn=_read("ami", attribute),
+        available_fn=_ami_available,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    )
+
+
+def _unbilled_date(key, name, attribute):
+    return TaipowerSensorEntityDescription(
+        key=key,
+        name=name,
+        data_domain=DATA_UNBILLED,
+        value_fn=_read("unbilled", attribute, "%Y-%m-%d"),
+        device_class=SensorDeviceClass.DATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    )
+
+
+def _refresh_metric(key, name, value_fn, attributes_fn, **kwargs):
+    # Changing on every refresh, these are only recorded once enabled.
+    return TaipowerSensorEntityDescription(
+        key=key,
+        name=name,
+        data_domain=DATA_METRICS,
+        value_fn=value_fn,
+        attributes_fn=attributes_fn,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        **kwargs,
+    )
+
+
+SENSORS = (
+    _ami_kwh("ami_offpeak_kwh", "AMI Off-peak Kw/h", "offpeak_kwh"),
+    _ami_kwh("ami_halfpeak_kwh", "AMI Half-peak Kw/h", "halfpeak_kwh"),
+    _ami_kwh("ami_satpeak_kwh", "AMI Saturday Half-peak Kw/h", "satpeak_kwh"),
+    _ami_kwh("ami_peak_kwh", "AMI Peak Kw/h", "peak_kwh"),
+    _ami_kwh("ami_total_kwh", "AMI Total Kw/h", "total_kwh"),
+    TaipowerSensorEntityDescription(
+        key="ami_start_time_indicator",
+        name="AMI Start Time Indicator",
+        data_domain=DATA_AMI,
+        value_fn=_read("ami", "start_time", "%Y-%m-%d-%H-%M-%S"),
+        device_class=SensorDeviceClass.DATE,
+    ),
+    TaipowerSensorEntityDescription(
+        key="ami_end_time_indicator",
+        name="AMI End Time Indicator",
+        data_domain=DATA_AMI,
+        value_fn=_read("ami", "end_time", "%Y-%m-%d-%H-%M-%S"),
+        device_class=SensorDeviceClass.DATE,
+    ),
+    TaipowerSensorEntityDescription(
+        key="ami_daily_kwh",
+        name="AMI Daily Kw/h",
+        data_domain=DATA_AMI,
+        value_fn=_rollup_total("day_kwh"),
+        attributes_fn=_day_attributes,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TaipowerSensorEntityDescription(
+        key="ami_weekly_kwh",
+        name="AMI Weekly Kw/h",
+        data_domain=DATA_AMI,
+        value_fn=_rollup_total("week_kwh"),
+        attributes_fn=_week_attributes,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TaipowerSensorEntityDescription(
+        key="ami_billing_period_kwh",
+        name="AMI Billing Period Kw/h",
+        data_domain=DATA_AMI,
+        value_fn=_rollup_total("billing_kwh"),
+        attributes_fn=_billing_period_attributes,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TaipowerSensorEntityDescription(
+        key="ami_estimated_charge",
+        name="AMI Estimated Charge",
+        data_domain=DATA_AMI,
+        value_fn=_estimated_charge,
+        attributes_fn=_estimated_charge_attributes,
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TaipowerSensorEntityDescription(
+        key="ami_unbilled_charge",
+        name="AMI Unbilled Charge",
+        data_domain=DATA_UNBILLED,
+        value_fn=_read("unbilled", "charge"),
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    _unbilled_date("ami_unbilled_deadline", "AMI Unbilled Deadline", "deadline"),
+    TaipowerSensorEntityDescription(
+        key="ami_unbilled_kwh",
+        name="AMI Unbilled Kw/h",
+        data_domain=DATA_UNBILLED,
+        value_fn=_read("unbilled", "kwh"),
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    _unbilled_date("ami_unbilled_reading_date", "AMI Unbilled Reading Date", "reading_date"),
+    _unbilled_date("ami_unbilled_last_reading_date", "AMI Unbilled Last Reading Date", "last_reading_date"),
+    _unbilled_date("ami_unbilled_next_reading_date", "AMI Unbilled Next Reading Date", "next_reading_date"),
+    TaipowerSensorEntityDescription(
+        key="bill_charge_period",
+        name="Bill Charge Period",
+        data_domain=DATA_BILL,
+        value_fn=_read("bill", "period"),
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TaipowerSensorEntityDescription(
+        key="bill_charge",
+        name="Bill Charge",
+        data_domain=DATA_BILL,
+        value_fn=_read("bill", "charge"),
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TaipowerSensorEntityDescription(
+        key="bill_formula",
+        name="Bill Formula",
+        data_domain=DATA_BILL,
+        value_fn=_read("bill", "formula"),
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TaipowerSensorEntityDescription(
+        key="bill_kwh",
+        name="Bill Kw/h",
+        data_domain=DATA_BILL,
+        value_fn=_read("bill", "kwh"),
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TaipowerSensorEntityDescription(
+        key="bill_month_indicator",
+        name="Bill Month Indicator",
+        data_domain=DATA_BILL,
+        value_fn=_read("bill", "month", "%Y-%m"),
+        device_class=SensorDeviceClass.DATE,
+    ),
+    _refresh_metric(
+        "refresh_latency", "Refresh Latency", _last_refresh("seconds", 3), _latency_attributes,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    _refresh_metric(
+        "refresh_payload_size", "Refresh Payload Size", _last_refresh("payload_bytes"), _payload_size_attributes,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    _refresh_metric(
+        "refresh_parse_time", "Refresh Parse Time", _last_refresh("parse_seconds", 6), _parse_time_attributes,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    _refresh_metric(
+        "refresh_retries", "Refresh Retries", _last_refresh("retries"), _retries_attributes,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    _refresh_metric(
+        "refresh_timeouts", "Refresh Timeouts", _timeouts, _timeouts_attributes,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+)
+
+
+def _create_entities(data):
+    entities = []
+    for meter in data[API].meters.values():
+        if meter.type != "AMI":
+            continue
+        coordinator = data[COORDINATOR][meter.number]
+        bill_coordinator = data[BILL_COORDINATOR][meter.number]
+        entities.extend(
+            TaipowerSensorEntity(
+                meter,
+                bill_coordinator if description.data_domain in BILL_DATA_DOMAINS else coordinator,
+                description,
+            )
+            for description in SENSORS
+        )
+    return entities
 
-class TaipowerAMIUnbilledNextReadingDateSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
 
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} AMI Unbilled Next Reading Date"
-
-    @property
-    def state(self):
-        """Return the date in yyyy-mm-dd format."""
-        value = self.native_value
-        if value is not None:
-            return self.native_value.strftime("%Y-%m-%d")
-        return None
-        
-    @property
-    def native_value(self):
-        """Return the date in datetime.date object."""
-        if self._meter.ami_unbilled is not None:
-            next_reading_date = self._meter.ami_unbilled.next_reading_date
-            return datetime.date(int(next_reading_date[0:4]), int(next_reading_date[4:6]), int(next_reading_date[6:8]))
-        return None
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    """Set up the sensor platform."""
+    async_add_entities(_create_entities(hass.data[DOMAIN][YAML_DATA]))
 
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_DATE
 
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_ami_unbilled_next_reading_date_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
+async def async_setup_entry(hass, config_entry, async_add_devices):
+    """Set up the sensor platform from a config entry."""
+    async_add_devices(_create_entities(hass.data[DOMAIN][config_entry.entry_id]))
 
 
-class TaipowerBillChargePeriodSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-    
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} Bill Charge Period"
-    
-    @property
-    def state(self):
-        """Return the bill charge period."""
-        month_key = self.hass.data[DOMAIN][MONTH_KEY]
-        if self._meter.bill_records is not None and month_key in self._meter.bill_records:
-            return self._meter.bill_records[month_key].period
-        return None
+class TaipowerSensorEntity(TaipowerEntity, SensorEntity):
+    """A sensor of a meter, described by a `TaipowerSensorEntityDescription`.
 
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_bill_charge_period_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
+    Its value, attributes and availability are read from the meter's view
+    once per update of its data domain, and the state is written as the
+    value function formats it.
+    """
 
+    entity_description: TaipowerSensorEntityDescription
 
-class TaipowerBillChargeSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
+    def __init__(self, meter, coordinator, description):
         super().__init__(meter, coordinator)
-    
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} Bill Charge"
-    
-    @property
-    def state(self):
-        """Return the bill charge."""
-        month_key = self.hass.data[DOMAIN][MONTH_KEY]
-        if self._meter.bill_records is not None and month_key in self._meter.bill_records:
-            return self._meter.bill_records[month_key].charge
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_MONETARY
+        self.entity_description = description
+        self.data_domain = description.data_domain
+        self._attr_name = f"{meter.name} {meter.number} {description.name}"
+        self._attr_unique_id = f"{meter.number}_{description.key}_sensor"
+        self._update_from_view()
 
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_bill_charge_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
+    def _update_from_view(self):
+        description = self.entity_description
+        self._attr_native_value = description.value_fn(self._view)
+        if description.attributes_fn is not None:
+            self._attr_extra_state_attributes = description.attributes_fn(self._view)
+        if description.available_fn is not None:
+            self._attr_available = description.available_fn(self._view)
 
+    def _shown_state(self):
+        return self._attr_available, self._attr_native_value, self.extra_state_attributes
 
-class TaipowerBillFormulaSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-    
     @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} Bill Formula"
-    
-    @property
-    def state(self):
-        """Return the bill formula."""
-        month_key = self.hass.data[DOMAIN][MONTH_KEY]
-        if self._meter.bill_records is not None and month_key in self._meter.bill_records:
-            return self._meter.bill_records[month_key].formula
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_MONETARY
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_bill_formula_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
-
-
-class TaipowerBillKwhSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
+    def available(self) -> bool:
+        return self._attr_available
 
     @property
     def name(self):
         """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} Bill Kw/h"
-
-    @property
-    def state(self):
-        """Return the bill KW/H."""
-        month_key = self.hass.data[DOMAIN][MONTH_KEY]
-        if self._meter.bill_records is not None and month_key in self._meter.bill_records:
-            return self._meter.bill_records[month_key].kwh
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_ENERGY
-
-    @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement."""
-        return ENERGY_KILO_WATT_HOUR
+        return self._attr_name
 
     @property
     def unique_id(self):
-        return f"{self._meter.number}_bill_kwh_sensor"
-    
-    @property
-    def state_class(self):
-        return STATE_CLASS_MEASUREMENT
-
-
-class TaipowerBillMonthIndicatorSensorEntity(TaipowerEntity, SensorEntity):
-    def __init__(self, meter, coordinator):
-        super().__init__(meter, coordinator)
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{self._meter.name} {self._meter.number} Bill Month Indicator"
+        return self._attr_unique_id
 
     @property
     def state(self):
-        """Return the month in yyyy-mm format."""
-        value = self.native_value
-        if value is not None:
-            return self.native_value.strftime("%Y-%m")
-        return None
-        
-    @property
-    def native_value(self):
-        """Return the month in datetime.date object."""
-        month_key = self.hass.data[DOMAIN][MONTH_KEY]
-        if month_key is not None:
-            return datetime.date(int(month_key[0:4]), int(month_key[5:]), 1)
-        return None
-
-    @property
-    def device_class(self):
-        """Return the device class."""
-        return DEVICE_CLASS_DATE
-
-    @property
-    def unique_id(self):
-        return f"{self._meter.number}_bill_month_indicator_sensor"
\ No newline at end of file
+        """Return the value read from the view."""
+        return self._attr_native_value
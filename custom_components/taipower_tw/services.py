@@ -0,0 +1,94 @@
+"""Taipower integration."""
+import logging
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.core import ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import (API, ATTR_ELECTRIC_NUMBER, ATTR_END, ATTR_PERIOD,
+                    ATTR_RECORDS, ATTR_START, DOMAIN, SERVICE_GET_AMI_RANGE,
+                    TAIPOWER_TIME_ZONE)
+from .history import AGGREGATED_COLUMNS, AMIHistory
+from .util import parse_ami_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+GET_AMI_RANGE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ELECTRIC_NUMBER): cv.string,
+        vol.Optional(ATTR_PERIOD): vol.In(["quater", "hour", "daily", "monthly"]),
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Required(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_RECORDS, default=False): cv.boolean,
+    }
+)
+
+
+def ami_key(value):
+    """Return the AMI `start_time` key of a datetime, naive ones being local time."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return value.astimezone(dt_util.get_time_zone(TAIPOWER_TIME_ZONE)).strftime("%Y%m%d%H%M%S")
+
+
+def find_api(hass, electric_number):
+    """Return the client of the account holding a meter."""
+    for data in hass.data.get(DOMAIN, {}).values():
+        if electric_number in data[API].meters:
+            return data[API]
+    raise HomeAssistantError(f"Unknown electric number {electric_number}.")
+
+
+@callback
+def async_setup_services(hass):
+    """Register the services of the integration once."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_AMI_RANGE):
+        return
+
+    async def async_get_ami_range(call : ServiceCall):
+        """Aggregate the kept AMI records of a meter within a time window."""
+        electric_number = call.data[ATTR_ELECTRIC_NUMBER]
+        api = find_api(hass, electric_number)
+        period = call.data.get(ATTR_PERIOD, api.ami_period)
+        if period != api.ami_period:
+            raise HomeAssistantError(f"Only {api.ami_period} AMI is kept, {period} is not available.")
+
+        ami = api.meters[electric_number].ami
+        if not isinstance(ami, AMIHistory):
+            ami = AMIHistory(ami)
+        keys = ami.keys_between(ami_key(call.data[ATTR_START]), ami_key(call.data[ATTR_END]))
+        response = {
+            ATTR_ELECTRIC_NUMBER: electric_number,
+            ATTR_PERIOD: period,
+            ATTR_START: call.data[ATTR_START].isoformat(),
+            ATTR_END: call.data[ATTR_END].isoformat(),
+            **ami.aggregate(keys),
+        }
+        if call.data[ATTR_RECORDS]:
+            response[ATTR_RECORDS] = [
+                {
+                    "start_time": parse_ami_datetime(ami[key].start_time).isoformat(),
+                    "end_time": parse_ami_datetime(ami[key].end_time).isoformat(),
+                    "is_missing_data": ami[key].is_missing_data,
+                    **{column: getattr(ami[key], column) for column in AGGREGATED_COLUMNS},
+                }
+                for key in keys
+            ]
+        _LOGGER.debug(f"Aggregated {len(keys)} AMI records of meter {electric_number}.")
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_AMI_RANGE,
+        async_get_ami_range,
+        schema=GET_AMI_RANGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+@callback
+def async_unload_services(hass):
+    """Remove the services of the integration once no account is left."""
+    hass.services.async_remove(DOMAIN, SERVICE_GET_AMI_RANGE)
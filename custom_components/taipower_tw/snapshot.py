@@ -0,0 +1,127 @@
+"""Taipower integration."""
+import datetime
+
+from .rollup import to_date, to_kwh
+from .util import parse_ami_datetime, parse_date
+
+
+class Snapshot:
+    """Immutable record of values parsed once from an API model object."""
+
+    __slots__ = ()
+
+    def _set(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class AMISnapshot(Snapshot):
+    """An AMI record with parsed times and kWh values."""
+
+    __slots__ = (
+        "start_time",
+        "end_time",
+        "is_missing_data",
+        "offpeak_kwh",
+        "halfpeak_kwh",
+        "satpeak_kwh",
+        "peak_kwh",
+        "total_kwh",
+    )
+
+    def __init__(self, ami):
+        self._set(
+            start_time=parse_ami_datetime(ami.start_time),
+            end_time=parse_ami_datetime(ami.end_time),
+            is_missing_data=ami.is_missing_data,
+            offpeak_kwh=ami.offpeak_kwh,
+            halfpeak_kwh=ami.halfpeak_kwh,
+            satpeak_kwh=ami.satpeak_kwh,
+            peak_kwh=ami.peak_kwh,
+            total_kwh=ami.total_kwh,
+        )
+
+
+class AMIUnbilledSnapshot(Snapshot):
+    """AMI unbilled data with parsed dates and numbers."""
+
+    __slots__ = (
+        "charge",
+        "kwh",
+        "deadline",
+        "reading_date",
+        "last_reading_date",
+        "next_reading_date",
+    )
+
+    def __init__(self, unbilled):
+        self._set(
+            charge=unbilled.charge,
+            kwh=unbilled.kwh,
+            deadline=parse_date(unbilled.deadline),
+            reading_date=parse_date(unbilled.reading_date),
+            last_reading_date=parse_date(unbilled.last_reading_date),
+            next_reading_date=parse_date(unbilled.next_reading_date),
+        )
+
+
+class BillSnapshot(Snapshot):
+    """A bill record of a month with parsed numbers."""
+
+    __slots__ = (
+        "month",
+        "period",
+        "charge",
+        "formula",
+        "kwh",
+    )
+
+    def __init__(self, month_key, bill):
+        # Keys are `yyyymm`, or `yyyy/mm` with older versions of libtaipower.
+        self._set(
+            month=datetime.date(int(month_key[0:4]), int(month_key[-2:]), 1),
+            period=bill.period,
+            charge=bill.charge,
+            formula=bill.formula,
+            kwh=bill.kwh,
+        )
+
+
+class RollupSnapshot(Snapshot):
+    """Sums of AMI kWh columns over the latest day, the latest week and the
+    current billing period."""
+
+    __slots__ = (
+        "day",
+        "day_kwh",
+        "week",
+        "week_kwh",
+        "billing_start",
+        "billing_kwh",
+        "billing_days",
+    )
+
+    def __init__(self, columns, billing_start=None):
+        days = columns.days()
+        day_labels, day_sums = columns.rollup(days)
+        week_labels, week_sums = columns.rollup(columns.weeks())
+        billing_labels, billing_sums = columns.rollup(days, since=billing_start) if billing_start else (None, None)
+        self._set(
+            day=to_date(day_labels[-1]) if len(day_labels) else None,
+            day_kwh=to_kwh(day_sums[-1]) if len(day_labels) else None,
+            week=to_date(week_labels[-1]) if len(week_labels) else None,
+            week_kwh=to_kwh(week_sums[-1]) if len(week_labels) else None,
+            billing_start=billing_start,
+            billing_kwh=to_kwh(billing_sums.sum(axis=0)) if billing_start else None,
+            billing_days=[
+                {"date": to_date(label).isoformat(), "total_kwh": round(float(total), 3)}
+                for label, total in zip(billing_labels, billing_sums[:, -1])
+            ] if billing_start else None,
+        )
@@ -0,0 +1,115 @@
+"""Taipower integration."""
+import asyncio
+import logging
+
+from homeassistant.const import UnitOfEnergy
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, TAIPOWER_TIME_ZONE
+from .util import parse_ami_datetime
+
+_LOGGER = logging.getLogger(__name__)
+# Maximum number of hourly rows handed to the recorder in a single import job.
+IMPORT_BATCH_SIZE = 1000
+# Statistic column and the AMI attribute it is read from. Quarter AMI only has totals.
+COLUMNS = {
+    "total": "total_kwh",
+    "offpeak": "offpeak_kwh",
+    "halfpeak": "halfpeak_kwh",
+    "satpeak": "satpeak_kwh",
+    "peak": "peak_kwh",
+}
+
+
+def statistic_id(electric_number, ami_period, column):
+    """Return the external statistic id of a meter, AMI period and column."""
+    return f"{DOMAIN}:{electric_number.lower()}_{ami_period}_{column}_kwh"
+
+
+def hourly_rows(history, keys, attribute):
+    """Sum an AMI column of `keys` into hour-aligned `(start, kwh)` rows.
+
+    Quarter records are added up per hour, and records missing data skipped.
+    """
+    rows = []
+    for key in keys:
+        record = history[key]
+        value = getattr(record, attribute)
+        if record.is_missing_data or value is None:
+            continue
+        start = parse_ami_datetime(key).replace(minute=0, second=0)
+        if rows and rows[-1][0] == start:
+            rows[-1][1] += float(value)
+        else:
+            rows.append([start, float(value)])
+    return rows
+
+
+class TaipowerStatistics:
+    """Imports the AMI history of meters as recorder long-term statistics.
+
+    Each column of each meter is an external statistic with an hourly `sum`.
+    Imports are incremental: rows from the last imported hour on are written
+    again, on top of the sum before that hour, so the recorder's upsert by
+    start time de-duplicates records that were imported before.
+    """
+
+    def __init__(self, hass, ami_period):
+        self.hass = hass
+        self.ami_period = ami_period
+        self._locks = {}
+        self._versions = {}
+
+    async def async_import(self, electric_number, history):
+        """Import AMI records of a meter added since the last import."""
+        if "recorder" not in self.hass.config.components:
+            return
+        async with self._locks.setdefault(electric_number, asyncio.Lock()):
+            if self._versions.get(electric_number) == history.version:
+                return
+            version = history.version
+            for column, attribute in COLUMNS.items():
+                await self._async_import_column(electric_number, history, column, attribute)
+            self._versions[electric_number] = version
+
+    async def _async_import_column(self, electric_number, history, column, attribute):
+        # The recorder is loaded by now, importing it up front would slow loading the integration down.
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics, get_last_statistics)
+
+        stat_id = statistic_id(electric_number, self.ami_period, column)
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, stat_id, True, {"state", "sum"}
+        )
+        if last.get(stat_id):
+            row = last[stat_id][0]
+            since = dt_util.utc_from_timestamp(row["start"]).astimezone(
+                dt_util.get_time_zone(TAIPOWER_TIME_ZONE)
+            )
+            keys = history.keys_since(since.strftime("%Y%m%d%H%M%S"))
+            total = (row["sum"] or 0) - (row["state"] or 0)
+        else:
+            keys = history.keys()
+            total = 0
+
+        rows = hourly_rows(history, keys, attribute)
+        if not rows:
+            return
+        metadata = {
+            "has_mean": False,
+            "has_sum": True,
+            "name": f"Taipower {electric_number} {column} kWh",
+            "source": DOMAIN,
+            "statistic_id": stat_id,
+            "unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
+        }
+        statistics = []
+        for start, kwh in rows:
+            total += kwh
+            statistics.append({"start": start, "state": kwh, "sum": total})
+        for index in range(0, len(statistics), IMPORT_BATCH_SIZE):
+            async_add_external_statistics(
+                self.hass, metadata, statistics[index:index + IMPORT_BATCH_SIZE]
+            )
+        _LOGGER.debug(f"Imported {len(statistics)} {column} statistics of meter {electric_number}.")
@@ -0,0 +1,102 @@
+"""Taipower integration."""
+import datetime
+
+TARIFF_TIERED = "tiered"
+TARIFF_TOU_TWO_STAGE = "tou_two_stage"
+TARIFF_TOU_THREE_STAGE = "tou_three_stage"
+TARIFFS = [TARIFF_TIERED, TARIFF_TOU_TWO_STAGE, TARIFF_TOU_THREE_STAGE]
+
+SUMMER_MONTHS = (6, 7, 8, 9)
+# Residential rates in NT$ per kWh effective 2024-04-01, update them when
+# Taipower revises its tariffs.
+# Tiered rates: (monthly kWh ceiling, summer rate, non-summer rate).
+TIERED_RATES = [
+    (120, 1.68, 1.68),
+    (330, 2.45, 2.16),
+    (500, 3.70, 3.03),
+    (700, 5.04, 4.14),
+    (1000, 6.24, 5.07),
+    (None, 8.46, 6.63),
+]
+# Simple time-of-use rates per AMI column: (summer rate, non-summer rate).
+# The two-stage plan bills weekday half-peak hours as peak and Saturdays as
+# off-peak.
+TOU_RATES = {
+    TARIFF_TOU_TWO_STAGE: {
+        "peak_kwh": (5.16, 4.93),
+        "halfpeak_kwh": (5.16, 4.93),
+        "satpeak_kwh": (2.06, 1.99),
+        "offpeak_kwh": (2.06, 1.99),
+    },
+    TARIFF_TOU_THREE_STAGE: {
+        "peak_kwh": (7.13, 4.93),
+        "halfpeak_kwh": (4.67, 4.60),
+        "satpeak_kwh": (2.14, 2.06),
+        "offpeak_kwh": (2.06, 1.99),
+    },
+}
+# Time-of-use basic charge per month and surcharge per kWh beyond the monthly limit.
+TOU_BASIC_CHARGE = 75.0
+TOU_OVERUSE_LIMIT = 2000
+TOU_OVERUSE_RATE = 1.02
+
+
+def summer_fraction(start, end):
+    """Return the fraction of days from `start` to `end`, inclusive, in summer months."""
+    days = (end - start).days + 1
+    if days <= 0:
+        return 0.0
+    summer = sum(
+        (start + datetime.timedelta(days=offset)).month in SUMMER_MONTHS for offset in range(days)
+    )
+    return summer / days
+
+
+def billing_months(last_reading_date, next_reading_date):
+    """Return the number of months of a billing cycle, which scales the tier ceilings."""
+    return max(1, round((next_reading_date - last_reading_date).days / 30.4))
+
+
+def tiered_charge(kwh, summer, months=1):
+    """Return the charge of `kwh` under the tiered rates of a season."""
+    charge = 0.0
+    lower = 0
+    for ceiling, summer_rate, non_summer_rate in TIERED_RATES:
+        upper = kwh if ceiling is None else min(kwh, ceiling * months)
+        if upper > lower:
+            charge += (upper - lower) * (summer_rate if summer else non_summer_rate)
+        if ceiling is None or kwh <= ceiling * months:
+            break
+        lower = ceiling * months
+    return charge
+
+
+def tou_charge(tariff, usage, summer, months=1):
+    """Return the charge of AMI column sums under a time-of-use plan of a season."""
+    charge = TOU_BASIC_CHARGE * months
+    for column, (summer_rate, non_summer_rate) in TOU_RATES[tariff].items():
+        charge += usage[column] * (summer_rate if summer else non_summer_rate)
+    overuse = usage["total_kwh"] - TOU_OVERUSE_LIMIT * months
+    if overuse > 0:
+        charge += overuse * TOU_OVERUSE_RATE
+    return charge
+
+
+def estimate_charge(tariff, usage, start, end, months=1):
+    """Estimate the charge of AMI column sums used from `start` to `end`.
+
+    Seasons are prorated by days. Returns None when a time-of-use plan is
+    requested but the usage is not split by time of use, as with quarter AMI.
+    """
+    fraction = summer_fraction(start, end)
+    if tariff == TARIFF_TIERED:
+        def charge(summer):
+            return tiered_charge(usage["total_kwh"], summer, months)
+    else:
+        split = sum(usage[column] for column in TOU_RATES[tariff])
+        if usage["total_kwh"] > 0 and split == 0:
+            return None
+
+        def charge(summer):
+            return tou_charge(tariff, usage, summer, months)
+    return fraction * charge(True) + (1 - fraction) * charge(False)
@@ -0,0 +1,30 @@
+"""Taipower integration."""
+import calendar
+import datetime
+
+from homeassistant.util import dt as dt_util
+
+from .const import TAIPOWER_TIME_ZONE
+
+
+def parse_ami_datetime(text):
+    """Parse a Taipower `yyyymmddHHMMSS` string into an aware datetime."""
+    return datetime.datetime(
+        int(text[0:4]), int(text[4:6]), int(text[6:8]),
+        int(text[8:10]), int(text[10:12]), int(text[12:14]),
+        tzinfo=dt_util.get_time_zone(TAIPOWER_TIME_ZONE),
+    )
+
+
+def parse_date(text):
+    """Parse a Taipower `yyyymmdd` string into a date."""
+    return datetime.date(int(text[0:4]), int(text[4:6]), int(text[6:8]))
+
+
+def add_months(value, months):
+    """Shift a date or datetime by whole months, clamping the day."""
+    month = value.month - 1 + months
+    year = value.year + month // 12
+    month = month % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
@@ -0,0 +1,116 @@
+"""Taipower integration."""
+from .rollup import AMIColumns
+from .snapshot import (AMISnapshot, AMIUnbilledSnapshot, BillSnapshot,
+                       RollupSnapshot)
+from .tariff import TARIFF_TIERED, billing_months, estimate_charge
+
+
+class KeyIndex:
+    """Ordered keys and the position of each key."""
+
+    __slots__ = ("keys", "positions")
+
+    def __init__(self, keys=()):
+        self.keys = list(keys)
+        self.positions = {key: position for position, key in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class TaipowerMeterView:
+    """What the entities of a meter currently show.
+
+    Holds the AMI record and bill month picked by the meter's selectors, so
+    moving one meter's selector leaves the other meters untouched, and
+    snapshots of the picked data that entities read without parsing. A
+    snapshot is only rebuilt when its source record was replaced, and the
+    key indexes backing the selectors, the columnar AMI copy and its rollups
+    when new data arrived. The charge of the current billing period is
+    estimated from the rollups with the meter's `tariff`. The refresh
+    `metrics` of the account, if given, are shown by the diagnostic sensors.
+    """
+
+    def __init__(self, electric_number, tariff=TARIFF_TIERED, metrics=None, max_retries=None):
+        self.electric_number = electric_number
+        self.tariff = tariff
+        self.account_metrics = metrics
+        self.metrics = metrics.meter(electric_number) if metrics is not None else None
+        self.max_retries = max_retries
+        self.ami_key = None
+        self.month_key = None
+        self.ami = None
+        self.unbilled = None
+        self.bill = None
+        self.rollups = None
+        self.estimate = None
+        self.ami_index = KeyIndex()
+        self.bill_index = KeyIndex()
+        self.columns = None
+        self._ami_record = None
+        self._unbilled_record = None
+        self._bill_record = None
+        self._ami_source = None
+        self._ami_version = None
+        self._bill_source = None
+
+    def update_ami(self, ami):
+        """Update the AMI index and the snapshot of the selected AMI record."""
+        version = getattr(ami, "version", None)
+        if ami is not self._ami_source or version != self._ami_version:
+            self._ami_source = ami
+            self._ami_version = version
+            self.ami_index = KeyIndex(ami.keys() if ami is not None else ())
+            self.columns = AMIColumns(ami) if ami is not None else None
+            self._update_rollups()
+        record = ami.get(self.ami_key) if ami is not None else None
+        if record is not self._ami_record:
+            self._ami_record = record
+            self.ami = AMISnapshot(record) if record is not None else None
+
+    def update_unbilled(self, unbilled):
+        """Update the snapshot of AMI unbilled data, returning whether the rollups changed."""
+        if unbilled is self._unbilled_record:
+            return False
+        self._unbilled_record = unbilled
+        self.unbilled = AMIUnbilledSnapshot(unbilled) if unbilled is not None else None
+        if self.rollups is None or self.rollups.billing_start == self._billing_start():
+            return False
+        self._update_rollups()
+        return True
+
+    def _billing_start(self):
+        return self.unbilled.last_reading_date if self.unbilled is not None else None
+
+    def _update_rollups(self):
+        self.rollups = RollupSnapshot(self.columns, self._billing_start()) if self.columns is not None else None
+        if self.rollups is None or self.rollups.billing_kwh is None or not self.rollups.billing_days:
+            self.estimate = None
+            return
+        self.estimate = estimate_charge(
+            self.tariff,
+            self.rollups.billing_kwh,
+            self.rollups.billing_start,
+            self.rollups.day,
+            billing_months(self.unbilled.last_reading_date, self.unbilled.next_reading_date),
+        )
+
+    def update_bill(self, bill_records):
+        """Update the bill index and the snapshot of the selected bill month."""
+        if bill_records is not self._bill_source:
+            self._bill_source = bill_records
+            self.bill_index = KeyIndex(bill_records.keys() if bill_records is not None else ())
+        record = bill_records.get(self.month_key) if bill_records is not None else None
+        if record is not self._bill_record:
+            self._bill_record = record
+            self.bill = BillSnapshot(self.month_key, record) if record is not None else None
+
+    def shows_bill(self, meter):
+        """Return whether the snapshots are of the meter's AMI unbilled data and bill records."""
+        return self._unbilled_record is meter.ami_unbilled and self._bill_source is meter.bill_records
+
+    def update(self, meter):
+        """Update all snapshots from a meter."""
+        self.update_ami(meter.ami)
+        self.update_unbilled(meter.ami_unbilled)
+        self.update_bill(meter.bill_records)
@@ -0,0 +1,257 @@
+"""Benchmarks of the integration's hot paths against the mock Taipower backend.
+
+Measures, for each meter count:
+
+- cold start: setting up a config entry until its entities are registered,
+  then until the first refreshes running in the background are done,
+- refresh: wall-clock time of refreshing all AMI and all bill coordinators,
+- executor occupancy: seconds spent in executor jobs during the refreshes,
+- state writes per AMI coordinator tick and per selector `set_value`.
+
+Results can be saved as a baseline and later runs compared against it:
+
+    python scripts/benchmark.py --meters 1 10 50 --save benchmark.json
+    python scripts/benchmark.py --meters 1 10 50 --compare benchmark.json
+
+Comparing exits with status 1 when a metric regressed beyond the tolerance.
+Requires Home Assistant and the integration's requirements to be installed.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant import config_entries, loader  # noqa: E402
+from homeassistant.core import CoreState, HomeAssistant  # noqa: E402
+from homeassistant.helpers import area_registry as ar  # noqa: E402
+from homeassistant.helpers import device_registry as dr  # noqa: E402
+from homeassistant.helpers import entity  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from homeassistant.helpers import issue_registry as ir  # noqa: E402
+
+from custom_components.taipower_tw.const import (  # noqa: E402
+    BILL_COORDINATOR, CONF_ACCOUNT, CONF_AMI_PERIOD, CONF_DEVICES,
+    CONF_ENDPOINT, CONF_PASSWORD, COORDINATOR, DOMAIN)
+from mock_server import MockTaipowerBackend  # noqa: E402
+
+# Timings below this many seconds are never reported as regressions.
+ABSOLUTE_SLACK = 0.005
+
+
+class Counters:
+    """Counts entity state writes and times executor jobs."""
+
+    def __init__(self):
+        self.state_writes = 0
+        self.executor_seconds = 0.0
+
+    def reset(self):
+        self.state_writes = 0
+        self.executor_seconds = 0.0
+
+    def install(self, hass):
+        counters = self
+        write_ha_state = entity.Entity.async_write_ha_state
+
+        def counting_write_ha_state(self):
+            counters.state_writes += 1
+            write_ha_state(self)
+
+        entity.Entity.async_write_ha_state = counting_write_ha_state
+
+        add_executor_job = hass.async_add_executor_job
+
+        def timed_add_executor_job(target, *args):
+            def timed(*args):
+                start = time.perf_counter()
+                try:
+                    return target(*args)
+                finally:
+                    counters.executor_seconds += time.perf_counter() - start
+
+            return add_executor_job(timed, *args)
+
+        hass.async_add_executor_job = timed_add_executor_job
+
+
+async def async_create_hass(config_dir):
+    """Create a bare Home Assistant instance able to load custom integrations."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    hass.config.set_time_zone("Asia/Taipei")
+    entity.async_setup(hass)
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await asyncio.gather(ar.async_load(hass), dr.async_load(hass), er.async_load(hass), ir.async_load(hass))
+    hass.set_state(CoreState.running)
+    return hass
+
+
+async def async_start_backend(meters, latency):
+    backend = MockTaipowerBackend(meters=meters, latency=latency)
+    runner = web.AppRunner(backend.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return backend, runner, f"http://{host}:{port}"
+
+
+async def async_timed(awaitable):
+    start = time.perf_counter()
+    await awaitable
+    return time.perf_counter() - start
+
+
+async def async_benchmark(meters, ami_period, latency):
+    """Run every benchmark for a meter count and return the metrics."""
+    backend, runner, endpoint = await async_start_backend(meters, latency)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_create_hass(config_dir)
+        counters = Counters()
+        counters.install(hass)
+        try:
+            entry = config_entries.ConfigEntry(
+                version=1,
+                minor_version=1,
+                domain=DOMAIN,
+                title="Taipower TW",
+                data={
+                    DOMAIN: {
+                        CONF_ACCOUNT: "0912345678",
+                        CONF_PASSWORD: "password",
+                        CONF_DEVICES: [],
+                        CONF_AMI_PERIOD: ami_period,
+                        CONF_ENDPOINT: endpoint,
+                    }
+                },
+                source=config_entries.SOURCE_USER,
+            )
+            start = time.perf_counter()
+            await hass.config_entries.async_add(entry)
+            cold_start = time.perf_counter() - start
+            await hass.async_block_till_done()
+            await asyncio.gather(*entry._background_tasks)
+            await hass.async_block_till_done()
+            startup = time.perf_counter() - start
+            entities = len(hass.states.async_entity_ids())
+            cold_start_writes = counters.state_writes
+
+            ami_coordinators = list(hass.data[DOMAIN][entry.entry_id][COORDINATOR].values())
+            bill_coordinators = list(hass.data[DOMAIN][entry.entry_id][BILL_COORDINATOR].values())
+            counters.reset()
+            ami_refresh = await async_timed(
+                asyncio.gather(*[coordinator.async_refresh() for coordinator in ami_coordinators])
+            )
+            bill_refresh = await async_timed(
+                asyncio.gather(*[coordinator.async_refresh() for coordinator in bill_coordinators])
+            )
+            await hass.async_block_till_done()
+            executor = counters.executor_seconds
+            refresh_writes = counters.state_writes
+
+            counters.reset()
+            await ami_coordinators[0].async_refresh()
+            await hass.async_block_till_done()
+            tick_writes = counters.state_writes
+
+            selector = next(
+                entity_id for entity_id in hass.states.async_entity_ids("number")
+                if entity_id.endswith("ami_selector")
+            )
+            counters.reset()
+            await hass.services.async_call(
+                "number", "set_value", {"entity_id": selector, "value": 1}, blocking=True
+            )
+            await hass.async_block_till_done()
+            set_value_writes = counters.state_writes
+        finally:
+            await hass.async_stop(force=True)
+            await runner.cleanup()
+
+    return {
+        "entities": entities,
+        "requests": backend.requests,
+        "cold_start_s": cold_start,
+        "startup_s": startup,
+        "cold_start_state_writes": cold_start_writes,
+        "ami_refresh_s": ami_refresh,
+        "bill_refresh_s": bill_refresh,
+        "refresh_executor_s": executor,
+        "refresh_state_writes": refresh_writes,
+        "ami_tick_state_writes": tick_writes,
+        "set_value_state_writes": set_value_writes,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return regressions of `results` against `baseline`."""
+    regressions = []
+    for meters, metrics in results.items():
+        for name, value in metrics.items():
+            if name in ("entities", "requests"):
+                continue
+            previous = baseline.get(meters, {}).get(name)
+            if previous is None:
+                continue
+            limit = previous * (1 + tolerance)
+            if name.endswith("_s"):
+                limit += ABSOLUTE_SLACK
+            if value > limit:
+                regressions.append(f"{meters} meter(s) {name}: {value:.4g} > {previous:.4g}")
+    return regressions
+
+
+async def async_main(args):
+    results = {}
+    for meters in args.meters:
+        metrics = await async_benchmark(meters, args.ami_period, args.latency)
+        results[str(meters)] = metrics
+        print(f"{meters} meter(s): " + ", ".join(
+            f"{name}={value:.4f}" if isinstance(value, float) else f"{name}={value}"
+            for name, value in metrics.items()
+        ))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meters", type=int, nargs="+", default=[1, 10, 50], help="meter counts to benchmark")
+    parser.add_argument("--ami-period", default="daily", choices=["quater", "hour", "daily", "monthly"])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every mock request")
+    parser.add_argument("--save", help="save the results as a baseline JSON file")
+    parser.add_argument("--compare", help="compare the results against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    # Imported up front so cold starts exclude import time, see import_time.py.
+    for module in ("api", "cache", "coordinator", "services", "number", "sensor"):
+        importlib.import_module(f"custom_components.taipower_tw.{module}")
+    results = asyncio.run(async_main(args))
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved baseline to {args.save}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
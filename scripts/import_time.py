@@ -0,0 +1,76 @@
+"""Import-time benchmark of the integration's modules.
+
+Imports each module in a fresh interpreter run with `-X importtime`, with the
+Home Assistant core modules every integration shares already loaded, and
+reports the cumulative import time of the module and whether it pulled in the
+heavy dependencies only needed once an account is set up:
+
+    python scripts/import_time.py
+    python scripts/import_time.py --runs 10
+
+Requires Home Assistant and the integration's requirements to be installed.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE = "custom_components.taipower_tw"
+# What Home Assistant has imported before it loads any integration.
+PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.update_coordinator",
+)
+MODULES = {
+    "integration": PACKAGE,
+    "config_flow": f"{PACKAGE}.config_flow",
+    "sensor": f"{PACKAGE}.sensor",
+    "number": f"{PACKAGE}.number",
+}
+HEAVY = {
+    "libtaipower": "Taipower",
+    "numpy": "numpy",
+    "recorder": "homeassistant.components.recorder",
+}
+
+
+def measure(module):
+    """Return the cumulative import time of `module` in seconds and the heavy dependencies it imported."""
+    code = "; ".join(f"import {name}" for name in PRELOADED) + f"; import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    seconds = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name == module:
+            seconds = int(cumulative) / 1e6
+        for label, heavy in HEAVY.items():
+            if name == heavy:
+                imported.add(label)
+    return seconds, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module, the median is reported")
+    args = parser.parse_args()
+
+    for label, module in MODULES.items():
+        runs = [measure(module) for _ in range(args.runs)]
+        seconds = statistics.median(seconds for seconds, _ in runs)
+        imported = ", ".join(sorted(runs[0][1])) or "none"
+        print(f"{label}: {seconds * 1000:.1f} ms, heavy dependencies: {imported}")
+
+
+if __name__ == "__main__":
+    main()
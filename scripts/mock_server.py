@@ -0,0 +1,341 @@
+"""Offline stand-in for the Taipower API.
+
+Serves login, meter list, AMI (all four periods), AMI bill, AMI unbilled and
+bill record payloads for any number of synthetic meters, with optional
+latency, error, throttling and session expiry injection. Payloads recorded from the real
+API can be replayed instead of the synthetic ones with `--fixtures`.
+
+Run it and point the integration at it in `configuration.yaml`:
+
+    python scripts/mock_server.py --meters 20 --latency 0.05
+
+    taipower_tw:
+      account: "0912345678"
+      password: "password"
+      endpoint: "http://127.0.0.1:8080"
+
+`MockTaipowerBackend` can also be embedded, e.g. by `scripts/benchmark.py`.
+"""
+import argparse
+import asyncio
+import collections
+import datetime
+import json
+import logging
+import random
+import uuid
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+TAIPOWER_TIME_ZONE = ZoneInfo("Asia/Taipei")
+AMI_STEP = {
+    "quater": datetime.timedelta(minutes=15),
+    "hour": datetime.timedelta(hours=1),
+    "daily": datetime.timedelta(days=1),
+}
+# Hours of each time-of-use column on weekdays, the rest being off-peak.
+PEAK_HOURS = range(16, 22)
+HALFPEAK_HOURS = (*range(9, 16), 22, 23)
+
+
+def electric_number(index):
+    """Return the electric number of the synthetic meter `index`."""
+    return f"{index:011d}"
+
+
+def roc_date(value):
+    """Format a date the way Taipower does, with the ROC year."""
+    return f"{value.year - 1911}{value:%m%d}"
+
+
+class MockTaipowerBackend:
+    """Synthetic Taipower API.
+
+    `latency` seconds are added to every request, a fraction `error_rate` of
+    data requests fail with HTTP 500, requests beyond `max_rate` per second
+    are throttled with HTTP 429, and access tokens expire after `token_ttl`
+    seconds, after which bearer requests get HTTP 401. Files in
+    `fixtures` named after the API path with slashes replaced by underscores,
+    e.g. `api_ami_daily.json`, are served verbatim instead of synthetic data.
+    """
+
+    def __init__(self, meters=1, latency=0.0, error_rate=0.0, token_ttl=86400, fixtures=None, seed=0, max_rate=None):
+        self.meters = [electric_number(index) for index in range(1, meters + 1)]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.max_rate = max_rate
+        self.throttled = 0
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._tokens = {}
+        self._refresh_tokens = set()
+        self._recent = collections.deque()
+
+    def make_app(self):
+        """Return the aiohttp application serving the API."""
+        app = web.Application()
+        app.router.add_post("/oauth/token", self._handle_token)
+        app.router.add_post("/member/getData", self._handle_member)
+        app.router.add_post("/api/ami/{period}", self._handle_ami)
+        app.router.add_post("/api/home/bills", self._handle_ami_bill)
+        app.router.add_post("/applyCase/amiUnbillData", self._handle_ami_unbilled)
+        app.router.add_post("/api/mybill/records", self._handle_bill_records)
+        return app
+
+    def expire_tokens(self):
+        """Expire every issued access token, as if the session timed out."""
+        self._tokens.clear()
+
+    def _throttle(self):
+        now = asyncio.get_running_loop().time()
+        while self._recent and self._recent[0] <= now - 1:
+            self._recent.popleft()
+        if len(self._recent) >= self.max_rate:
+            self.throttled += 1
+            return web.json_response({"error": "too_many_requests"}, status=429, headers={"Retry-After": "1"})
+        self._recent.append(now)
+        return None
+
+    async def _prepare(self, request, bearer=True):
+        self.requests += 1
+        if self.max_rate and (throttled := self._throttle()) is not None:
+            return throttled
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if bearer:
+            token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            expiration = self._tokens.get(token)
+            if expiration is None or expiration < asyncio.get_running_loop().time():
+                return web.json_response({"error": "invalid_token"}, status=401)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.json_response({"error": "server_error", "error_description": "Injected error"}, status=500)
+        return None
+
+    def _fixture(self, request):
+        if self.fixtures is None:
+            return None
+        path = self.fixtures / f"{request.path.strip('/').replace('/', '_')}.json"
+        if not path.exists():
+            return None
+        return web.json_response(json.loads(path.read_text(encoding="utf-8")))
+
+    @staticmethod
+    def _success(data):
+        return web.json_response({"success": True, "message": "", "data": data})
+
+    async def _handle_token(self, request):
+        if (error := await self._prepare(request, bearer=False)) is not None:
+            return error
+        form = await request.post()
+        if form.get("grant_type") == "refresh_token":
+            if form.get("refresh_token") not in self._refresh_tokens:
+                return web.json_response({"error": "invalid_grant", "error_description": "Invalid refresh token"}, status=400)
+            self._refresh_tokens.discard(form["refresh_token"])
+        access_token = uuid.uuid4().hex
+        refresh_token = uuid.uuid4().hex
+        self._tokens[access_token] = asyncio.get_running_loop().time() + self.token_ttl
+        self._refresh_tokens.add(refresh_token)
+        return web.json_response(
+            {
+                "token_type": "bearer",
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expires_in": self.token_ttl,
+            }
+        )
+
+    async def _handle_member(self, request):
+        if (error := await self._prepare(request)) is not None:
+            return error
+        return self._success(
+            {
+                "electricList": [
+                    {
+                        "electricNumber": number,
+                        "ami": "true",
+                        "electricName": f"Meter {index}",
+                        "nickname": "",
+                        "userID": 1,
+                        "verifiedLevel": "1",
+                        "electricAddr": f"No. {index}, Mock Rd.",
+                    }
+                    for index, number in enumerate(self.meters, 1)
+                ]
+            }
+        )
+
+    async def _handle_ami(self, request):
+        if (error := await self._prepare(request)) is not None:
+            return error
+        if (fixture := self._fixture(request)) is not None:
+            return fixture
+        period = request.match_info["period"]
+        body = await request.json()
+        return self._success({"data": self.ami_records(body["custNo"], period, body)})
+
+    async def _handle_ami_bill(self, request):
+        if (error := await self._prepare(request)) is not None:
+            return error
+        if (fixture := self._fixture(request)) is not None:
+            return fixture
+        today = datetime.datetime.now(TAIPOWER_TIME_ZONE).date()
+        return self._success(
+            {
+                "startDate": roc_date(today.replace(day=1)),
+                "endDate": roc_date(today),
+                "currentAmount": 1000,
+                "kwh": 300,
+                "kwhData": True,
+                "theLast2Kwh": 320,
+                "lastKwh": 310,
+            }
+        )
+
+    async def _handle_ami_unbilled(self, request):
+        if (error := await self._prepare(request)) is not None:
+            return error
+        if (fixture := self._fixture(request)) is not None:
+            return fixture
+        today = datetime.datetime.now(TAIPOWER_TIME_ZONE).date()
+        last_reading = today.replace(day=1)
+        kwh = sum(
+            record["totalKwh"]
+            for record in self.ami_records((await request.json())["customNo"], "daily", {"yearMonth": f"{today:%Y%m}"})
+        )
+        return self._success(
+            {
+                "ami": True,
+                "totalAmount": str(round(kwh * 2.5)),
+                "payDeadline": roc_date(today + datetime.timedelta(days=20)),
+                "finalKwh": str(round(kwh, 2)),
+                "readingDate": roc_date(today),
+                "lastReadDate": roc_date(last_reading),
+                "nextReadingDate": roc_date(last_reading + datetime.timedelta(days=61)),
+            }
+        )
+
+    async def _handle_bill_records(self, request):
+        if (error := await self._prepare(request)) is not None:
+            return error
+        if (fixture := self._fixture(request)) is not None:
+            return fixture
+        today = datetime.datetime.now(TAIPOWER_TIME_ZONE).date()
+        records = []
+        for months_ago in range(2, 26, 2):
+            year, month = divmod(today.year * 12 + today.month - 1 - months_ago, 12)
+            month += 1
+            kwh = 400 + (month * 37) % 200
+            records.append(
+                {
+                    "issueYM": f"{year - 1911}/{month:02d}",
+                    "totalCharge": f"{kwh * 3:,}",
+                    "billFormula": f"{kwh} kWh",
+                    "totalKwh": kwh,
+                    "billFromAndToDate": f"{year - 1911}/{month:02d}/01~{year - 1911}/{month:02d}/28",
+                    "hasPaid": "C",
+                }
+            )
+        return self._success(records)
+
+    def ami_records(self, number, period, query):
+        """Return the synthetic AMI records of a meter in a query window, up to now."""
+        now = datetime.datetime.now(TAIPOWER_TIME_ZONE).replace(tzinfo=None)
+        if period in ("quater", "hour"):
+            start = datetime.datetime.strptime(query["date"], "%Y%m%d")
+            end = start + datetime.timedelta(days=1)
+        elif period == "daily":
+            start = datetime.datetime.strptime(query["yearMonth"], "%Y%m")
+            end = (start + datetime.timedelta(days=32)).replace(day=1)
+        else:
+            start = datetime.datetime(int(query["year"]), 1, 1)
+            end = start.replace(year=start.year + 1)
+
+        records = []
+        slot = start
+        while slot < end:
+            slot_end = self._next_slot(slot, period)
+            if slot_end > now:
+                break
+            records.append(self._ami_record(number, period, slot, slot_end))
+            slot = slot_end
+        return records
+
+    @staticmethod
+    def _next_slot(slot, period):
+        if period == "monthly":
+            return (slot + datetime.timedelta(days=32)).replace(day=1)
+        return slot + AMI_STEP[period]
+
+    def _ami_record(self, number, period, start, end):
+        record = {
+            "startTime": f"{start:%Y%m%d%H%M%S}",
+            "endTime": f"{end:%Y%m%d%H%M%S}",
+            "isMssingData": 0,
+        }
+        if period == "quater":
+            generator = random.Random(f"{number}{start}")
+            record["kwh"] = round(self._hourly_kwh(start.hour, generator) / 4, 3)
+            return record
+
+        columns = {"offPeakKwh": 0.0, "halfPeakKwh": 0.0, "satPeakKwh": 0.0, "peakTimeKwh": 0.0}
+        hour = start
+        while hour < end:
+            generator = random.Random(f"{number}{hour}")
+            columns[self._column(hour)] += self._hourly_kwh(hour.hour, generator)
+            hour += datetime.timedelta(hours=1)
+        record.update({column: round(value, 3) for column, value in columns.items()})
+        record["totalKwh"] = round(sum(columns.values()), 3)
+        return record
+
+    @staticmethod
+    def _column(hour):
+        if hour.weekday() == 6:
+            return "offPeakKwh"
+        if hour.weekday() == 5:
+            return "satPeakKwh" if hour.hour in HALFPEAK_HOURS or hour.hour in PEAK_HOURS else "offPeakKwh"
+        if hour.hour in PEAK_HOURS:
+            return "peakTimeKwh"
+        if hour.hour in HALFPEAK_HOURS:
+            return "halfPeakKwh"
+        return "offPeakKwh"
+
+    @staticmethod
+    def _hourly_kwh(hour, generator):
+        base = 0.8 if 18 <= hour <= 23 else 0.3
+        return base + generator.random() * 0.4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--meters", type=int, default=1, help="number of synthetic meters")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with HTTP 500")
+    parser.add_argument("--max-rate", type=float, help="requests per second served before throttling")
+    parser.add_argument("--token-ttl", type=int, default=86400, help="lifetime of access tokens in seconds")
+    parser.add_argument("--fixtures", help="directory of recorded payloads to replay")
+    parser.add_argument("--seed", type=int, default=0, help="seed of error injection")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    backend = MockTaipowerBackend(
+        meters=args.meters,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        token_ttl=args.token_ttl,
+        fixtures=args.fixtures,
+        seed=args.seed,
+        max_rate=args.max_rate,
+    )
+    _LOGGER.info(f"Serving meters {backend.meters}")
+    web.run_app(backend.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()